@@ -0,0 +1,45 @@
+"""Helpers shared by the benchmark scripts.
+
+Run the scripts from the repository root, e.g. `python benchmarks/bench_clean_data.py`.
+Importing this module puts the cookbook folder on the path so the helper
+modules (weather.py, ...) can be imported.
+"""
+import atexit
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+sys.path.insert(0, str(ROOT / "cookbook"))
+
+
+def best_of(fn, repeat=3):
+    """Run `fn` `repeat` times and return the fastest wall time in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def print_timings(title, timings):
+    """Print `{label: seconds}` relative to the first (reference) entry."""
+    print(title)
+    reference = next(iter(timings.values()))
+    for label, seconds in timings.items():
+        print(f"  {label:<40} {seconds * 1000:10.1f} ms  {reference / seconds:6.1f}x")
+
+
+def synthetic_complaints(rows, seed=0, **kwargs):
+    """Write `rows` synthetic 311 service requests to a temporary file and return its path."""
+    from synthetic import write_complaints
+
+    tmp = Path(tempfile.mkdtemp())
+    atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+    path = tmp / "311-service-requests.csv"
+    write_complaints(path, rows, seed=seed, **kwargs)
+    return path
@@ -0,0 +1,50 @@
+"""Joining daily counts of many counters with daily weather: hash join vs sorted merge.
+
+The counts are long (`Date, counter, count`) for `--counters` counters over
+`--years` years, the weather is synthetic hourly data aggregated to days.
+"""
+import argparse
+
+from _common import best_of, print_timings
+
+import numpy as np
+import polars as pl
+
+from bench_calendar_features import daily_counters
+from bikes_weather import daily_weather, join_daily_weather
+from synthetic import weather_chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--counters", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    hours = weather_chunk(np.random.default_rng(0), 0, args.years * 8784).select(
+        pl.col("Date/Time (LST)").str.to_datetime("%Y-%m-%d %H:%M").alias("date_time"),
+        pl.col("Temp (°C)").cast(pl.Float64).alias("temperature_c"),
+        pl.col("Weather").alias("weather"),
+    )
+    daily = daily_weather(hours)
+    counts = daily_counters(args.years, args.counters).sort("Date")
+    shuffled = counts.sample(fraction=1.0, shuffle=True, seed=0)
+
+    def hash_join(frame):
+        return frame.join(daily, left_on="Date", right_on="date", how="left")
+
+    assert hash_join(counts).equals(join_daily_weather(counts, daily))
+    print_timings(
+        f"Daily weather for {counts.height:,} counts ({args.counters} counters, {args.years} years)",
+        {
+            "hash join, unsorted counts": best_of(lambda: hash_join(shuffled), args.repeat),
+            "hash join, sorted counts": best_of(lambda: hash_join(counts), args.repeat),
+            "join_asof on sorted dates": best_of(lambda: join_daily_weather(counts, daily), args.repeat),
+            "sort, then join_asof": best_of(lambda: join_daily_weather(shuffled, daily), args.repeat),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Weekday names on multi-year daily counter data: Python UDF vs native expressions."""
+import argparse
+from datetime import date
+
+from _common import best_of, print_timings
+
+import numpy as np
+import polars as pl
+
+from calendar_features import DATE_FEATURES, WEEKDAYS, calendar_features, weekday_name
+
+
+def daily_counters(years, counters, seed=0):
+    dates = pl.date_range(date(2012, 1, 1), date(2012 + years - 1, 12, 31), "1d", eager=True)
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame({"Date": dates}).join(
+        pl.DataFrame({"counter": [f"counter {i}" for i in range(counters)]}), how="cross"
+    ).with_columns(pl.Series("count", rng.poisson(2000, len(dates) * counters)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--counters", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    bikes = daily_counters(args.years, args.counters)
+    weekday_map = dict(enumerate(WEEKDAYS, start=1))
+
+    def udf():
+        return bikes.with_columns(
+            pl.col("Date").dt.weekday()
+            .map_elements(lambda x: weekday_map[x], return_dtype=pl.String)
+            .alias("weekday_name")
+        ).group_by("weekday_name").agg(pl.sum("count"))
+
+    def native():
+        return bikes.with_columns(weekday_name("Date")).group_by("weekday_name").agg(pl.sum("count"))
+
+    print_timings(
+        f"Weekday names for {bikes.height:,} daily counts",
+        {
+            "map_elements(lambda x: weekday_map[x])": best_of(udf, args.repeat),
+            "weekday_name (native)": best_of(native, args.repeat),
+            # Date has no time of day, so hour is left out.
+            "all date features (native)": best_of(
+                lambda: bikes.with_columns(calendar_features("Date", DATE_FEATURES)), args.repeat
+            ),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
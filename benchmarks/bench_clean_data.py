@@ -0,0 +1,49 @@
+"""Benchmark cleaning a multi-year raw weather file: pandas vs Polars.
+
+The raw file is a synthetic download (see synthetic.py) covering `--years` years
+in the layout of the weather.gc.ca bulk download (BOM'd header, `Â°C` units,
+empty flag columns).
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from _common import best_of, print_timings
+
+import pandas as pd
+import polars as pl
+
+from synthetic import write_weather_raw
+from weather import clean_data, clean_data_pl, scan_weather_csv
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "raw_weather.csv"
+        write_weather_raw(path, args.years * 8784)
+
+        def pandas_clean():
+            data = pd.read_csv(path, index_col="Date/Time (LST)", parse_dates=True, header=0, encoding="latin1")
+            return clean_data(data)
+
+        def polars_eager_clean():
+            data = pl.read_csv(path, try_parse_dates=True, encoding="latin1")
+            return clean_data_pl(data)
+
+        assert scan_weather_csv(path).columns == polars_eager_clean().columns
+        print_timings(
+            f"clean_data on {args.years} years of hourly weather ({path.stat().st_size / 2**20:.1f} MB)",
+            {
+                "pandas read_csv + clean_data": best_of(pandas_clean, args.repeat),
+                "polars read_csv + clean_data_pl": best_of(polars_eager_clean, args.repeat),
+                "polars scan_csv + clean_data_pl": best_of(lambda: scan_weather_csv(path), args.repeat),
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Chapter 7's probes of Incident Zip and City, one scan each, vs one profile of every column.
+
+The probes are the ones Chapter 7 runs by hand: the unique zips, the zips
+with a dash, the long zips, the 00000s and the unique cities.
+"""
+import argparse
+
+from _common import best_of, print_timings, synthetic_complaints
+
+import polars as pl
+
+from column_profile import profile_columns, suggest_read_options
+
+ZIP = pl.col("Incident Zip")
+
+
+def probes(path):
+    scan = pl.scan_csv(path, infer_schema=False)
+    return [
+        scan.select(ZIP.unique()).collect(),
+        scan.filter(ZIP.str.contains("-", literal=True)).select(pl.len()).collect(),
+        scan.filter(ZIP.str.len_chars() > 5).select(ZIP.unique()).collect(),
+        scan.filter(ZIP == "00000").collect(),
+        scan.select(pl.col("City").unique()).collect(),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default=None, help="a 311 export, synthetic data if not given")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows of synthetic data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if args.path is None:
+        args.path = synthetic_complaints(args.rows)
+
+    print_timings(
+        f"Profiling {args.path}",
+        {
+            "5 probes, one scan each": best_of(lambda: probes(args.path), args.repeat),
+            "profile of Incident Zip and City": best_of(
+                lambda: profile_columns(args.path, ["Incident Zip", "City"]), args.repeat
+            ),
+            "profile of every column": best_of(lambda: profile_columns(args.path), args.repeat),
+        },
+    )
+    options = suggest_read_options(profile_columns(args.path))
+    print(f"  suggested null_values: {options['null_values']}")
+    print(f"  suggested schema_overrides: {options['schema_overrides']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Memory and load time of the 311 data: all strings vs the typed schema."""
+import argparse
+import time
+
+from _common import print_timings, synthetic_complaints
+
+from complaints import read_complaints
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default=None, help="a 311 export, synthetic data if not given")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows of synthetic data")
+    args = parser.parse_args()
+    if args.path is None:
+        args.path = synthetic_complaints(args.rows)
+
+    timings = {}
+    for label, typed in [("all strings (infer_schema_length=0)", False), ("typed schema", True)]:
+        start = time.perf_counter()
+        complaints = read_complaints(args.path, typed=typed)
+        timings[label] = time.perf_counter() - start
+        print(f"{label:<40} {complaints.estimated_size('mb'):10.1f} MB")
+    print_timings(f"Loading {args.path}", timings)
+
+
+if __name__ == "__main__":
+    main()
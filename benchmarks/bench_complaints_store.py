@@ -0,0 +1,77 @@
+"""Selective 311 filters: CSV vs one Parquet file vs the Borough/Complaint Type store.
+
+The store (see complaints_store.py) is written to a temporary directory
+from a synthetic file with `--types` complaint types, and every filter is
+run on the CSV, on a single unsorted Parquet file, on the store with
+`scan_store` (Polars' own pruning) and with `query` (the footer planner).
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from _common import best_of, print_timings, synthetic_complaints
+
+import polars as pl
+
+from complaints import scan_complaints
+from complaints_store import plan, query, scan_store, write_store
+
+FILTERS = {
+    "Brooklyn noise": ({"Borough": "BROOKLYN", "Complaint Type": "Noise - Street/Sidewalk"}, {}),
+    "one complaint type": ({"Complaint Type": "Noise - Street/Sidewalk"}, {}),
+    "zip prefix 112": ({}, {"Incident Zip": "112"}),
+}
+COLUMNS = ["Unique Key", "Borough", "Complaint Type", "Incident Zip"]
+
+
+def condition(equals, prefixes):
+    conditions = [pl.col(column).cast(pl.String) == value for column, value in equals.items()]
+    conditions += [pl.col(column).str.starts_with(prefix) for column, prefix in prefixes.items()]
+    return pl.all_horizontal(conditions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default=None, help="a 311 export, synthetic data if not given")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="rows of synthetic data")
+    parser.add_argument("--types", type=int, default=200, help="complaint types of synthetic data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if args.path is None:
+        args.path = synthetic_complaints(args.rows, n_complaint_types=args.types)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = Path(tmp) / "complaints.parquet"
+        scan_complaints(args.path).sink_parquet(single)
+        store = Path(tmp) / "store"
+        write_store(args.path, store)
+
+        for name, (equals, prefixes) in FILTERS.items():
+            plans = plan(store, equals, prefixes)
+            read = sum(len(file_plan.row_groups) for file_plan in plans)
+            total = sum(file_plan.total_row_groups for file_plan in plan(store))
+            predicate = condition(equals, prefixes)
+            print_timings(
+                f"{name}: {query(store, equals, prefixes, COLUMNS).height:,} rows,"
+                f" {read} of {total} row groups read",
+                {
+                    "CSV scan + filter": best_of(
+                        lambda: scan_complaints(args.path).filter(predicate).select(COLUMNS)
+                        .collect(engine="streaming"),
+                        args.repeat,
+                    ),
+                    "one Parquet file + filter": best_of(
+                        lambda: pl.scan_parquet(single).filter(predicate).select(COLUMNS).collect(), args.repeat
+                    ),
+                    "store, scan_store + filter": best_of(
+                        lambda: scan_store(store).filter(predicate).select(COLUMNS).collect(), args.repeat
+                    ),
+                    "store, planned row groups": best_of(
+                        lambda: query(store, equals, prefixes, COLUMNS), args.repeat
+                    ),
+                },
+            )
+
+
+if __name__ == "__main__":
+    main()
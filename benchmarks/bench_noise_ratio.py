@@ -0,0 +1,46 @@
+"""Chapter 3 noise ratio: two group-bys plus a join vs one streaming lazy query."""
+import argparse
+
+from _common import best_of, print_timings, synthetic_complaints
+
+import polars as pl
+
+from complaints import noise_ratio_by_borough, scan_complaints
+
+NOISE = "Noise - Street/Sidewalk"
+
+
+def two_group_bys(complaints):
+    noise_complaints = complaints.filter(pl.col("Complaint Type") == NOISE)
+    noise_complaints_count = noise_complaints.group_by("Borough").len("count")
+    total_complaints_count = complaints.group_by("Borough").len("count")
+    ratios = noise_complaints_count.join(total_complaints_count, on="Borough", suffix="_total")
+    return ratios.with_columns((pl.col("count") / pl.col("count_total")).alias("ratio"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default=None, help="a 311 export, synthetic data if not given")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows of synthetic data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if args.path is None:
+        args.path = synthetic_complaints(args.rows)
+
+    columns = ["Borough", "Complaint Type"]
+    print_timings(
+        f"Noise ratio by borough on {args.path}",
+        {
+            "read + 2 group-bys + join": best_of(
+                lambda: two_group_bys(scan_complaints(args.path).select(columns).collect()), args.repeat
+            ),
+            "scan + conditional sum (streaming)": best_of(
+                lambda: noise_ratio_by_borough(scan_complaints(args.path)).collect(engine="streaming"),
+                args.repeat,
+            ),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
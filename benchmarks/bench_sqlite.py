@@ -0,0 +1,64 @@
+"""Hourly weather history: SQLite (bulk insert, indexed range reads) vs re-parsing the CSV."""
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from _common import DATA_DIR, best_of, print_timings
+
+import polars as pl
+
+from weather_sqlite import read_weather, write_weather
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    weather = pl.read_csv(DATA_DIR / "weather_2012.csv", try_parse_dates=True)
+    weather = pl.concat(
+        weather.with_columns(pl.col("date_time").dt.offset_by(f"{offset}y")) for offset in range(args.years)
+    )
+    december = (datetime(2012, 12, 1), datetime(2013, 1, 1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "weather.csv"
+        sqlite_path = Path(tmp) / "weather.sqlite"
+        weather.write_csv(csv_path)
+
+        start = time.perf_counter()
+        write_weather(weather, sqlite_path, source=None)
+        print(f"bulk insert of {weather.height:,} rows: {time.perf_counter() - start:.2f} s")
+
+        def csv_range():
+            return pl.read_csv(csv_path, try_parse_dates=True).filter(
+                pl.col("date_time").is_between(*december, closed="left")
+            )
+
+        print_timings(
+            f"December 2012 out of {args.years} years of hourly weather",
+            {
+                "re-parse CSV + filter": best_of(csv_range, args.repeat),
+                "scan_csv + filter": best_of(
+                    lambda: pl.scan_csv(csv_path, try_parse_dates=True)
+                    .filter(pl.col("date_time").is_between(*december, closed="left"))
+                    .collect(),
+                    args.repeat,
+                ),
+                "SQLite indexed range query": best_of(lambda: read_weather(*december, path=sqlite_path), args.repeat),
+            },
+        )
+        print_timings(
+            "Whole history",
+            {
+                "re-parse CSV": best_of(lambda: pl.read_csv(csv_path, try_parse_dates=True), args.repeat),
+                "SQLite batched read": best_of(lambda: read_weather(path=sqlite_path), args.repeat),
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""The 10 most common complaint types: full sort vs top_k vs bounded-memory sketches.
+
+The synthetic file has `--types` complaint types with Zipf frequencies, so
+most of them are rare. After the timings, the sketches' counts are compared
+with the exact ones and with the error bounds they report.
+"""
+import argparse
+
+from _common import best_of, print_timings, synthetic_complaints
+
+import polars as pl
+
+from top_k import approx_top_values, top_values
+
+COLUMN = "Complaint Type"
+
+
+def full_sort(path):
+    counts = pl.read_csv(path, columns=[COLUMN], infer_schema=False)[COLUMN].value_counts()
+    return counts.sort("count", descending=True).head(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default=None, help="a 311 export, synthetic data if not given")
+    parser.add_argument("--rows", type=int, default=5_000_000, help="rows of synthetic data")
+    parser.add_argument("--types", type=int, default=1_000_000, help="complaint types of synthetic data")
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if args.path is None:
+        args.path = synthetic_complaints(args.rows, n_complaint_types=args.types)
+
+    scan = pl.scan_csv(args.path, infer_schema=False)
+    sketches = {
+        "space_saving": {"capacity": args.capacity},
+        "count_min": {"capacity": args.capacity, "width": 2**16, "depth": 4},
+    }
+    print_timings(
+        f"Top 10 {COLUMN} in {args.path}",
+        {
+            "value_counts + full sort": best_of(lambda: full_sort(args.path), args.repeat),
+            "group_by + top_k (streaming)": best_of(
+                lambda: top_values(scan, COLUMN).collect(engine="streaming"), args.repeat
+            ),
+            **{
+                f"{method} sketch ({args.capacity} values)": best_of(
+                    lambda method=method: approx_top_values(scan, COLUMN, method=method, **options), args.repeat
+                )
+                for method, options in sketches.items()
+            },
+        },
+    )
+
+    exact = top_values(scan, COLUMN, 100).collect(engine="streaming")
+    for method, options in sketches.items():
+        approx = approx_top_values(scan, COLUMN, method=method, **options)
+        compared = approx.join(exact.rename({"count": "exact"}), on=COLUMN, how="left")
+        overestimate = (compared["count"] - compared["exact"]).max()
+        found = len(set(approx[COLUMN]) & set(exact[COLUMN][:10]))
+        print(
+            f"  {method}: {found}/10 of the true top 10, {compared['guaranteed'].sum()} guaranteed,"
+            f" largest overestimate {overestimate} (reported bound {approx['error'].max()})"
+        )
+
+
+if __name__ == "__main__":
+    main()
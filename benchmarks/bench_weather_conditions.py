@@ -0,0 +1,46 @@
+"""Snow/rain fractions over decades of hourly weather: str.contains vs Enum flag tables."""
+import argparse
+
+from _common import best_of, print_timings
+
+import numpy as np
+import polars as pl
+
+from synthetic import weather_chunk
+from weather_conditions import CONDITIONS, condition_flags, encode_weather
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    weather = weather_chunk(np.random.default_rng(0), 0, args.years * 8784).select(pl.col("Weather").alias("weather"))
+    encoded = encode_weather(weather)
+    flags = condition_flags(encoded.schema["weather"])
+
+    def strings():
+        return weather.select([
+            pl.col("weather").str.contains(condition, literal=True).mean().alias(condition)
+            for condition in CONDITIONS
+        ])
+
+    def enum_flags():
+        return encoded.select([flag.mean() for flag in flags])
+
+    assert strings().row(0) == enum_flags().row(0)
+    print_timings(
+        f"Fractions of {len(CONDITIONS)} conditions over {weather.height:,} hours",
+        {
+            "str.contains on String": best_of(strings, args.repeat),
+            "flag table on Enum": best_of(enum_flags, args.repeat),
+            "flag table, including encoding": best_of(
+                lambda: encode_weather(weather).select([flag.mean() for flag in flags]), args.repeat
+            ),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
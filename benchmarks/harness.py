@@ -0,0 +1,143 @@
+"""Run every cookbook recipe with pandas and Polars at several data scales.
+
+    python benchmarks/harness.py --scales 1 10 50 --output bench_results.json
+
+Each (recipe, library, scale) runs in a fresh process so the memory numbers
+don't leak between runs. For every run we record:
+
+* `wall_s`: the fastest of `--repeat` runs (all runs are in `wall_all_s`)
+* `peak_rss_bytes`: how far the process's peak RSS grew while running the recipe
+* `python_alloc_peak_bytes`: peak of the allocations tracemalloc sees, in one
+  extra run after the timed ones (tracing would slow them down). This includes
+  NumPy (and so pandas) buffers but not memory Polars allocates in Rust, which
+  is why the RSS number is the one to compare between libraries.
+
+The JSON report includes the library versions, so reports from different
+Polars versions can be compared with `--baseline old_report.json`.
+"""
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from multiprocessing import get_context
+from pathlib import Path
+
+from _common import ROOT
+
+from recipes import RECIPES
+
+LIBRARIES = ("pandas", "polars")
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(recipe_name, library, inputs, repeat):
+    recipe = next(recipe for recipe in RECIPES if recipe.name == recipe_name)
+    run = getattr(recipe, library)(inputs)
+    rss_before = _peak_rss_bytes()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    peak_rss = _peak_rss_bytes() - rss_before
+    # tracemalloc slows down every Python allocation, pandas far more than Polars,
+    # so the allocation peak comes from one more run after the timed ones.
+    tracemalloc.start()
+    run()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "wall_s": min(times),
+        "wall_all_s": times,
+        "peak_rss_bytes": peak_rss,
+        "python_alloc_peak_bytes": python_peak,
+    }
+
+
+def _versions():
+    versions = {"python": platform.python_version()}
+    for package in ("polars", "pandas", "numpy", "pyarrow"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def run_benchmarks(recipes, scales, repeat=3, workdir=None):
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        prepared = {}
+        for scale in scales:
+            for recipe in recipes:
+                key = (recipe.prepare, scale)
+                if key not in prepared:
+                    scale_dir = Path(tmp) / f"scale{scale}"
+                    scale_dir.mkdir(exist_ok=True)
+                    prepared[key] = recipe.prepare(scale, scale_dir)
+                for library in LIBRARIES:
+                    # A new process per run, so peak RSS is not inherited from an earlier run.
+                    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                        measurement = pool.submit(
+                            _measure, recipe.name, library, prepared[key], repeat
+                        ).result()
+                    result = {"chapter": recipe.chapter, "recipe": recipe.name, "library": library,
+                              "scale": scale, **measurement}
+                    print(
+                        f"chapter {recipe.chapter} {recipe.name:<18} {library:<7} x{scale:<5}"
+                        f"{result['wall_s'] * 1000:10.1f} ms {result['peak_rss_bytes'] / 2**20:8.1f} MB"
+                    )
+                    results.append(result)
+    return results
+
+
+def compare(results, baseline):
+    """Print runs that got more than 10% slower than in the baseline report."""
+    def key(result):
+        return result["recipe"], result["library"], result["scale"]
+
+    before = {key(result): result["wall_s"] for result in baseline["results"]}
+    for result in results:
+        old = before.get(key(result))
+        if old and result["wall_s"] > 1.1 * old:
+            print(f"slower: {'/'.join(map(str, key(result)))} {old * 1000:.1f} -> {result['wall_s'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--chapters", type=int, nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=ROOT / "bench_results.json")
+    parser.add_argument("--baseline", type=Path, default=None)
+    args = parser.parse_args()
+
+    recipes = [recipe for recipe in RECIPES if args.chapters is None or recipe.chapter in args.chapters]
+
+    results = run_benchmarks(recipes, args.scales, args.repeat)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "platform": platform.platform(),
+        "versions": _versions(),
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {args.output}")
+    if args.baseline:
+        compare(results, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
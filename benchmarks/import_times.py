@@ -0,0 +1,87 @@
+"""Import time of every chapter: the chapter script's imports vs its module in cookbook/chapters.
+
+    python benchmarks/import_times.py --repeat 5 --output import_times.json
+
+"before" runs all the import statements of the chapter script (pandas,
+matplotlib.pyplot, numpy, ...), "after" imports the chapter module, which
+only loads Polars and the cookbook helpers. Both run with `python -X
+importtime` in a fresh interpreter from the cookbook folder; the fastest of
+`--repeat` runs is reported, so the first run's bytecode compilation doesn't
+count. The report also lists which of the heavy packages got imported.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from _common import ROOT
+
+from chapters import CHAPTERS
+
+COOKBOOK_DIR = ROOT / "cookbook"
+HEAVY_PACKAGES = ("pandas", "numpy", "matplotlib", "pyarrow", "polars")
+
+
+def chapter_script(chapter):
+    return next(COOKBOOK_DIR.glob(f"Chapter {chapter} - *.py"))
+
+
+def script_imports(path):
+    """The import statements of a chapter script, as one line of code."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "; ".join(ast.unparse(node) for node in imports)
+
+
+def parse_importtime(stderr):
+    """Total import time in microseconds and the set of imported top-level packages."""
+    total = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        packages.add(name.strip().split(".")[0])
+        # Nested imports are indented below the module that imported them.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, packages
+
+
+def measure(code, repeat):
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=COOKBOOK_DIR, capture_output=True, text=True, check=True,
+        )
+        runs.append(parse_importtime(completed.stderr))
+    total, packages = min(runs, key=lambda run: run[0])
+    return {"import_ms": total / 1000, "heavy_packages": sorted(packages.intersection(HEAVY_PACKAGES))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, nargs="+", default=sorted(CHAPTERS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    report = []
+    for chapter in args.chapters:
+        before = measure(script_imports(chapter_script(chapter)), args.repeat)
+        after = measure(f"import {CHAPTERS[chapter]}", args.repeat)
+        report.append({"chapter": chapter, "before": before, "after": after})
+        print(
+            f"chapter {chapter}: {before['import_ms']:8.1f} ms -> {after['import_ms']:8.1f} ms"
+            f"  ({', '.join(before['heavy_packages'])} -> {', '.join(after['heavy_packages'])})"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
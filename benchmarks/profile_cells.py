@@ -0,0 +1,186 @@
+"""Run a chapter script `# %%` cell by `# %%` cell and find the slow cells.
+
+    python benchmarks/profile_cells.py "cookbook/Chapter 8 - How to deal with timestamps.py"
+    python benchmarks/profile_cells.py cookbook/Chapter*.py --output cell_profile.json
+
+All cells of a chapter run in one namespace, from the cookbook folder (so
+relative paths and the helper modules work), with matplotlib's Agg backend.
+For every cell we record:
+
+* `wall_s` and `cpu_s` (CPU time of all threads, so Polars' thread pool counts)
+* `peak_rss_delta_bytes`: how far RSS rose above its value at the start of
+  the cell, sampled every few milliseconds
+* the Polars DataFrames, LazyFrames and Series the cell bound to a name, with
+  their shape and estimated size, and the optimized plan (`explain()`) of
+  every LazyFrame
+
+The cells are printed from slowest to fastest; `--output` also writes the
+whole report as JSON.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from _common import ROOT
+
+COOKBOOK_DIR = ROOT / "cookbook"
+CELL_MARKER = "# %%"
+
+
+def split_cells(source):
+    """(first line number, title, code) per cell. Code before the first marker is a cell too."""
+    cells = []
+    start, title, lines = 1, "", []
+    for number, line in enumerate(source.splitlines(keepends=True), start=1):
+        if line.startswith(CELL_MARKER):
+            if "".join(lines).strip():
+                cells.append((start, title, "".join(lines)))
+            start, title, lines = number, line[len(CELL_MARKER):].strip(), []
+        else:
+            lines.append(line)
+    if "".join(lines).strip():
+        cells.append((start, title, "".join(lines)))
+    return cells
+
+
+def _rss_bytes():
+    # Current (not peak) RSS; only Linux has it without extra dependencies.
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Track the highest RSS while a block runs."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start = self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __enter__(self):
+        self.start = self.peak = _rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+    @property
+    def delta(self):
+        return self.peak - self.start
+
+
+def describe_polars_objects(namespace, before):
+    """The Polars objects bound to a name that is new or now points to a different object."""
+    pl = sys.modules.get("polars")
+    if pl is None:
+        return []
+    objects = []
+    for name, value in namespace.items():
+        if before.get(name) is value or not isinstance(value, (pl.DataFrame, pl.LazyFrame, pl.Series)):
+            continue
+        entry = {"name": name, "type": type(value).__name__}
+        if isinstance(value, pl.LazyFrame):
+            try:
+                entry["plan"] = value.explain()
+            except Exception as error:  # e.g. a scan of a file that has since been removed
+                entry["plan_error"] = repr(error)
+        else:
+            entry["shape"] = list(value.shape)
+            entry["estimated_size_bytes"] = value.estimated_size()
+        objects.append(entry)
+    return objects
+
+
+def profile_chapter(path, keep_going=False):
+    path = Path(path).resolve()
+    namespace = {"__name__": "__main__", "__file__": str(path)}
+    results = []
+    for number, (first_line, title, code) in enumerate(split_cells(path.read_text(encoding="utf-8")), start=1):
+        # Pad with empty lines so tracebacks point at the right line of the chapter.
+        compiled = compile("\n" * (first_line - 1) + code, str(path), "exec")
+        before = dict(namespace)
+        error = None
+        with RssSampler() as rss:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                exec(compiled, namespace)
+            except Exception:
+                error = traceback.format_exc()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        results.append({
+            "chapter": path.name,
+            "cell": number,
+            "line": first_line,
+            "title": title or code.strip().splitlines()[0][:60],
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "peak_rss_delta_bytes": rss.delta,
+            "polars_objects": describe_polars_objects(namespace, before),
+            "error": error,
+        })
+        if error:
+            print(f"{path.name}, cell {number} (line {first_line}) failed:\n{error}", file=sys.stderr)
+            if not keep_going:
+                break
+    return results
+
+
+def print_report(results, top):
+    ranked = sorted(results, key=lambda result: result["wall_s"], reverse=True)
+    total = sum(result["wall_s"] for result in results) or 1
+    print(f"{'wall ms':>10} {'cpu ms':>10} {'rss MB':>8} {'share':>6}  cell")
+    for result in ranked[:top]:
+        frames = len(result["polars_objects"])
+        print(
+            f"{result['wall_s'] * 1000:10.1f} {result['cpu_s'] * 1000:10.1f}"
+            f" {result['peak_rss_delta_bytes'] / 2**20:8.1f} {result['wall_s'] / total:6.1%}"
+            f"  {result['chapter']} #{result['cell']} (line {result['line']}): {result['title']}"
+            f"{f' [{frames} polars objects]' if frames else ''}{' [failed]' if result['error'] else ''}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("chapters", type=Path, nargs="+")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--keep-going", action="store_true", help="run the remaining cells after a failing cell")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    chapters = [path.resolve() for path in args.chapters]
+    output = args.output.resolve() if args.output else None
+    os.chdir(COOKBOOK_DIR)
+    sys.path.insert(0, str(COOKBOOK_DIR))
+
+    results = []
+    for path in chapters:
+        results.extend(profile_chapter(path, args.keep_going))
+    print_report(results, args.top)
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+        print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
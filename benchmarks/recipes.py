@@ -0,0 +1,242 @@
+"""The cookbook recipes as pandas/Polars pairs for benchmarks/harness.py.
+
+Every recipe has a `prepare(scale, workdir)` function that writes its input
+files at the given scale (the bundled data repeated `scale` times, or
+synthetic data from synthetic.py where the repository has none) and two
+functions, one per library, that load the inputs and return a zero-argument
+callable running the recipe. Only that callable is timed.
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from _common import DATA_DIR
+
+import polars as pl
+
+@dataclass
+class Recipe:
+    chapter: int
+    name: str
+    prepare: Callable
+    pandas: Callable
+    polars: Callable
+
+
+def _shift_years(frame, column, scale):
+    # Repeat a year of data `scale` times, one year later each time.
+    return pl.concat(
+        frame.with_columns(pl.col(column).dt.offset_by(f"{offset}y")) for offset in range(scale)
+    )
+
+
+# Chapter 1: reading bikes.csv -------------------------------------------------
+
+def prepare_bikes(scale, workdir):
+    bikes = pl.read_csv(DATA_DIR / "bikes.csv", separator=";", encoding="latin1")
+    bikes = bikes.with_columns(pl.col("Date").str.strptime(pl.Date, "%d/%m/%Y"))
+    bikes = _shift_years(bikes, "Date", scale).with_columns(pl.col("Date").dt.strftime("%d/%m/%Y"))
+    path = workdir / "bikes.csv"
+    with open(path, "w", encoding="latin1") as f:
+        f.write(bikes.write_csv(separator=";"))
+    return {"bikes": path}
+
+
+def read_bikes_pandas(inputs):
+    import pandas as pd
+
+    return lambda: pd.read_csv(
+        inputs["bikes"], sep=";", encoding="latin1", parse_dates=["Date"], dayfirst=True, index_col="Date"
+    )
+
+
+def read_bikes_polars(inputs):
+    def run():
+        bikes = pl.read_csv(inputs["bikes"], separator=";", encoding="latin1")
+        return bikes.with_columns(pl.col("Date").str.strptime(pl.Date, "%d/%m/%Y")).sort("Date")
+    return run
+
+
+# Chapter 2: most common complaint types ---------------------------------------
+
+def prepare_complaints(scale, workdir):
+    # The 311 export isn't in the repository, so use a synthetic one (~100k rows like the original).
+    from synthetic import write_complaints
+
+    path = workdir / "311-service-requests.csv"
+    write_complaints(path, 100_000 * scale)
+    return {"complaints": path}
+
+
+def complaint_counts_pandas(inputs):
+    import pandas as pd
+
+    complaints = pd.read_csv(inputs["complaints"], dtype="unicode")
+    return lambda: complaints["Complaint Type"].value_counts()[:10]
+
+
+def complaint_counts_polars(inputs):
+    from complaints import read_complaints
+
+    complaints = read_complaints(inputs["complaints"])
+    return lambda: complaints["Complaint Type"].value_counts().sort("count", descending=True)[:10]
+
+
+# Chapter 3: noise complaints per borough --------------------------------------
+
+def noise_ratio_pandas(inputs):
+    import pandas as pd
+
+    complaints = pd.read_csv(inputs["complaints"], dtype="unicode")
+
+    def run():
+        is_noise = complaints["Complaint Type"] == "Noise - Street/Sidewalk"
+        noise_complaints = complaints[is_noise]
+        return noise_complaints["Borough"].value_counts() / complaints["Borough"].value_counts()
+    return run
+
+
+def noise_ratio_polars(inputs):
+    from complaints import noise_ratio_by_borough, read_complaints
+
+    complaints = read_complaints(inputs["complaints"])
+    return lambda: noise_ratio_by_borough(complaints).collect()
+
+
+# Chapter 4: cyclists per weekday -----------------------------------------------
+
+def weekday_counts_pandas(inputs):
+    run = read_bikes_pandas(inputs)
+    bikes = run()
+    return lambda: bikes["Berri 1"].groupby(bikes.index.weekday).sum()
+
+
+def weekday_counts_polars(inputs):
+    from calendar_features import weekday_name
+
+    bikes = read_bikes_polars(inputs)()
+    return lambda: bikes.group_by(weekday_name("Date")).agg(pl.sum("Berri 1")).sort("weekday_name")
+
+
+# Chapter 5: cleaning downloaded weather data -----------------------------------
+
+def prepare_raw_weather(scale, workdir):
+    from synthetic import write_weather_raw
+
+    path = workdir / "raw_weather.csv"
+    write_weather_raw(path, 8784 * scale)
+    return {"raw_weather": path}
+
+
+def clean_weather_pandas(inputs):
+    import pandas as pd
+    from weather import clean_data
+
+    def run():
+        data = pd.read_csv(
+            inputs["raw_weather"], index_col="Date/Time (LST)", parse_dates=True, header=0, encoding="latin1"
+        )
+        return clean_data(data)
+    return run
+
+
+def clean_weather_polars(inputs):
+    from weather import scan_weather_csv
+
+    return lambda: scan_weather_csv(inputs["raw_weather"])
+
+
+# Chapter 6: monthly temperature and snowiness -----------------------------------
+
+def prepare_weather(scale, workdir):
+    weather = pl.read_csv(DATA_DIR / "weather_2012.csv", try_parse_dates=True)
+    path = workdir / "weather.csv"
+    _shift_years(weather, "date_time", scale).write_csv(path)
+    return {"weather": path}
+
+
+def monthly_weather_pandas(inputs):
+    import pandas as pd
+
+    weather = pd.read_csv(inputs["weather"], parse_dates=True, index_col="date_time")
+
+    def run():
+        temperature = weather["temperature_c"].resample("M").median()
+        snowiness = weather["weather"].str.contains("Snow").astype(float).resample("M").mean()
+        return temperature, snowiness
+    return run
+
+
+def monthly_weather_polars(inputs):
+    weather = pl.read_csv(inputs["weather"], try_parse_dates=True)
+
+    def run():
+        return weather.group_by_dynamic("date_time", every="1mo").agg(
+            pl.col("temperature_c").median(),
+            pl.col("weather").str.contains("Snow").mean().alias("snowiness"),
+        )
+    return run
+
+
+# Chapter 7: fixing zip codes ---------------------------------------------------
+
+def fix_zips_pandas(inputs):
+    import numpy as np
+    import pandas as pd
+
+    requests = pd.read_csv(inputs["complaints"], na_values=["NO CLUE", "N/A", "0"], dtype="unicode")
+
+    def run():
+        zip_codes = requests["Incident Zip"].str.slice(0, 5)
+        return zip_codes.where(zip_codes != "00000", np.nan).unique()
+    return run
+
+
+def fix_zips_polars(inputs):
+    from complaints import normalize_zip, read_complaints
+
+    requests = read_complaints(inputs["complaints"])
+    return lambda: requests.select(normalize_zip().unique())
+
+
+# Chapter 8: popularity-contest timestamps ------------------------------------------
+
+def prepare_popcon(scale, workdir):
+    with open(DATA_DIR / "popularity-contest", encoding="utf-8") as f:
+        lines = f.readlines()
+    path = workdir / "popularity-contest"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(lines[0])
+        f.writelines(lines[1:-1] * scale)
+        f.write(lines[-1])
+    return {"popcon": path}
+
+
+def popcon_pandas(inputs):
+    import pandas as pd
+
+    def run():
+        # The header line has five fields, so pandas uses it as the header (as in the original cookbook).
+        popcon = pd.read_csv(inputs["popcon"], sep=" ")[:-1]
+        popcon.columns = ["atime", "ctime", "package-name", "mru-program", "tag"]
+        popcon["atime"] = pd.to_datetime(popcon["atime"].astype(int), unit="s")
+        popcon["ctime"] = pd.to_datetime(popcon["ctime"].astype(int), unit="s")
+        return popcon
+    return run
+
+
+def popcon_polars(inputs):
+    from popcon import read_popcon
+
+    return lambda: read_popcon(inputs["popcon"])
+
+
+RECIPES = [
+    Recipe(1, "read_bikes", prepare_bikes, read_bikes_pandas, read_bikes_polars),
+    Recipe(2, "complaint_counts", prepare_complaints, complaint_counts_pandas, complaint_counts_polars),
+    Recipe(3, "noise_ratio", prepare_complaints, noise_ratio_pandas, noise_ratio_polars),
+    Recipe(4, "weekday_counts", prepare_bikes, weekday_counts_pandas, weekday_counts_polars),
+    Recipe(5, "clean_weather", prepare_raw_weather, clean_weather_pandas, clean_weather_polars),
+    Recipe(6, "monthly_weather", prepare_weather, monthly_weather_pandas, monthly_weather_polars),
+    Recipe(7, "fix_zips", prepare_complaints, fix_zips_pandas, fix_zips_polars),
+    Recipe(8, "popcon", prepare_popcon, popcon_pandas, popcon_polars),
+]
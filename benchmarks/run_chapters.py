@@ -0,0 +1,150 @@
+"""Run chapter scripts headless, in parallel, and keep their outputs.
+
+    python benchmarks/run_chapters.py                      # every chapter
+    python benchmarks/run_chapters.py --chapters 2 3 7 --workers 3 --results results/
+
+Every chapter runs cell by cell (see profile_cells.py) in its own worker
+process with matplotlib's Agg backend. `plt.show()` saves the open figures
+instead of showing them. For every chapter the results directory gets:
+
+* `stdout.txt`: everything the chapter printed
+* `figure-<n>.png`: the figures, in the order they were shown
+* `cells.json`: the per-cell timings, memory and Polars objects
+
+and `summary.json` lists every chapter's wall time and status.
+
+The datasets the chapters load are decoded once, before the workers start,
+into the memory-mapped Arrow cache of datasets.py. The workers' `datasets.load`
+calls then map the same files instead of each parsing its own copy, and the
+operating system shares the pages between the processes.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+from _common import ROOT
+
+from profile_cells import COOKBOOK_DIR, profile_chapter
+
+DATASET_PATTERN = re.compile(r"""datasets\.(?:load|path)\(\s*["']([\w-]+)["']""")
+CUBE_PATTERN = re.compile(r"""\bcube\(\s*["']([\w-]+)["']""")
+
+
+def chapter_files(chapters=None):
+    files = sorted(COOKBOOK_DIR.glob("Chapter * - *.py"), key=lambda path: int(path.name.split()[1]))
+    if chapters is None:
+        return files
+    return [path for path in files if int(path.name.split()[1]) in chapters]
+
+
+def shared_inputs(files, pattern):
+    """The names matched by `pattern` (a dataset or a cube) in the chapters."""
+    return sorted({name for path in files for name in pattern.findall(path.read_text(encoding="utf-8"))})
+
+
+def warm_inputs(names, cubes):
+    """Fill the Arrow cache for the datasets `names` and build the `cubes`.
+
+    Returns the datasets whose source isn't there. Doing this before the
+    workers start also means they never write the same cache file at once.
+    """
+    import datasets
+    import time_cube
+
+    missing = []
+    for name in names:
+        if datasets.path(name).exists():
+            datasets.load(name)
+        else:
+            missing.append(name)
+    for name in cubes:
+        if datasets.path(name).exists():
+            time_cube.cube(name)
+    return missing
+
+
+def _run_chapter(path, output_dir):
+    os.environ["MPLBACKEND"] = "Agg"
+    os.chdir(COOKBOOK_DIR)
+    sys.path.insert(0, str(COOKBOOK_DIR))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    import matplotlib.pyplot as plt
+
+    figures = []
+
+    def show(*args, **kwargs):
+        for number in plt.get_fignums():
+            figure_path = output_dir / f"figure-{len(figures) + 1}.png"
+            plt.figure(number).savefig(figure_path, bbox_inches="tight")
+            figures.append(figure_path.name)
+        plt.close("all")
+
+    plt.show = show
+    stdout = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(stdout):
+        cells = profile_chapter(path)
+        show()  # figures that were drawn but never shown
+    wall = time.perf_counter() - start
+
+    (output_dir / "stdout.txt").write_text(stdout.getvalue(), encoding="utf-8")
+    (output_dir / "cells.json").write_text(json.dumps(cells, indent=2))
+    failed = next((cell for cell in cells if cell["error"]), None)
+    return {
+        "chapter": path.name,
+        "wall_s": wall,
+        "cells": len(cells),
+        "figures": figures,
+        "status": "failed" if failed else "ok",
+        "error": failed and failed["error"].strip().splitlines()[-1],
+    }
+
+
+def run_chapters(files, results_dir, workers=None):
+    results_dir.mkdir(parents=True, exist_ok=True)
+    summary = []
+    # spawn: every worker starts clean instead of inheriting the parent's Polars thread pool.
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+        futures = {pool.submit(_run_chapter, path, results_dir / path.stem): path for path in files}
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"{result['status']:<6} {result['wall_s']:8.1f} s  {result['chapter']}"
+                  f"{'  ' + result['error'] if result['error'] else ''}")
+            summary.append(result)
+    summary.sort(key=lambda result: int(result["chapter"].split()[1]))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--results", type=Path, default=ROOT / "results")
+    args = parser.parse_args()
+
+    files = chapter_files(args.chapters)
+    names = shared_inputs(files, DATASET_PATTERN)
+    start = time.perf_counter()
+    missing = warm_inputs(names, shared_inputs(files, CUBE_PATTERN))
+    print(f"decoded {', '.join(set(names) - set(missing)) or 'nothing'} in {time.perf_counter() - start:.1f} s")
+    if missing:
+        print(f"not found, chapters using them will fail: {', '.join(missing)}")
+
+    results_dir = args.results.resolve()
+    summary = run_chapters(files, results_dir, args.workers)
+    (results_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+    print(f"wrote {results_dir}")
+    sys.exit(any(result["status"] != "ok" for result in summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Generate large synthetic versions of the cookbook datasets.
+
+    python benchmarks/synthetic.py complaints /tmp/311.csv --rows 50_000_000
+    python benchmarks/synthetic.py weather /tmp/weather_raw.csv --rows 876_000 --seed 1
+
+The files have the same quirks as the real ones, so the cookbook code
+(and its clean-up steps) runs on them unchanged:
+
+* bikes: `;` separated, latin1 header, day-first dates and two empty counters
+* weather: the raw weather.gc.ca bulk download layout with a BOM'd
+  `"Longitude (x)"` header, `°C` units (`Â°C` when read as latin1), quoted
+  fields, empty flag columns and multi-valued conditions like "Rain,Fog"
+* complaints: 311 service requests with messy zip codes (`N/A`, `NO CLUE`,
+  `0`, `00000`, ZIP+4, far-away zips, blanks) and mixed-case cities
+* popcon: popularity-contest reports with the header and footer lines,
+  `<NOFILES>` entries and an optional tag column
+
+Random values are drawn with NumPy in chunks of `--chunk-rows` and formatted
+with Polars, so memory stays bounded and tens of GB are written quickly. The
+same seed and chunk size always give the same file.
+"""
+import argparse
+from datetime import datetime
+
+import numpy as np
+import polars as pl
+
+# Bikes -------------------------------------------------------------------------
+
+BIKE_COUNTERS = {
+    # column name: (mean daily count, or None for a counter without data)
+    "Berri 1": 2900,
+    "Brébeuf (données non disponibles)": None,
+    "Côte-Sainte-Catherine": 1200,
+    "Maisonneuve 1": 1700,
+    "Maisonneuve 2": 3200,
+    "du Parc": 1800,
+    "Pierre-Dupuy": 900,
+    "Rachel1": 3400,
+    "St-Urbain (données non disponibles)": None,
+}
+
+
+# Epoch offsets of the first day/hour/second of the synthetic data.
+BIKES_START_DAY = 15340  # 2012-01-01
+WEATHER_START_SECOND = 1325376000  # 2012-01-01 00:00
+COMPLAINTS_START_SECOND = 1380585600  # 2013-10-01 00:00
+
+
+def bike_counters(seed, extra_counters=0):
+    """The real counters plus `extra_counters` made up ones, for wide frames."""
+    rng = np.random.default_rng(seed)
+    counters = dict(BIKE_COUNTERS)
+    counters.update({f"Counter {i}": int(rng.integers(200, 4000)) for i in range(extra_counters)})
+    return counters
+
+
+def bikes_chunk(rng, start, rows, counters):
+    days = BIKES_START_DAY + np.arange(start, start + rows)
+    day_of_year = np.arange(start, start + rows) % 365
+    # Few cyclists in winter, most in summer, fewer at the weekend.
+    season = np.clip(np.sin((day_of_year - 80) / 365 * 2 * np.pi) + 0.3, 0.02, None)
+    weekday = (days + 3) % 7  # 1970-01-01 was a Thursday
+    weekend = np.where(weekday >= 5, 0.6, 1.0)
+    columns = {"Date": pl.from_epoch(pl.Series(days), time_unit="d").dt.strftime("%d/%m/%Y")}
+    for name, mean in counters.items():
+        if mean is None:
+            columns[name] = pl.repeat(None, rows, dtype=pl.Int64, eager=True)
+        else:
+            columns[name] = rng.poisson(mean * season * weekend)
+    return pl.DataFrame(columns)
+
+
+def write_bikes(path, rows, seed=0, chunk_rows=1_000_000, extra_counters=0):
+    counters = bike_counters(seed, extra_counters)
+    with open(path, "wb") as f:
+        f.write((";".join(["Date", *counters]) + "\n").encode("latin1"))
+        for start in range(0, rows, chunk_rows):
+            rng = np.random.default_rng([seed, start])
+            chunk = bikes_chunk(rng, start, min(chunk_rows, rows - start), counters)
+            chunk.write_csv(f, separator=";", include_header=False)
+
+
+# Weather -----------------------------------------------------------------------
+
+STATION = {
+    "Longitude (x)": "-73.75",
+    "Latitude (y)": "45.47",
+    "Station Name": "MONTREAL/PIERRE ELLIOTT TRUDEAU INTL A",
+    "Climate ID": "7025250",
+}
+WEATHER_CONDITIONS = {
+    "Mainly Clear": 2106, "Mostly Cloudy": 2069, "Cloudy": 1728, "Clear": 1326, "Snow": 390,
+    "Rain": 306, "Rain Showers": 188, "Fog": 150, "Rain,Fog": 144, "Drizzle,Fog": 98,
+    "Snow,Blowing Snow": 67, "Snow Showers": 60, "Drizzle": 41, "Thunderstorms,Rain Showers": 25,
+    "Freezing Drizzle,Fog": 20, "Haze": 16, "Freezing Rain": 14, "Freezing Rain,Fog": 8,
+    "Freezing Drizzle": 7, "Moderate Snow": 4, "Freezing Fog": 4, "Snow Showers,Fog": 4,
+    "Rain Showers,Fog": 3, "Thunderstorms": 2, "Moderate Snow,Blowing Snow": 2, "Snow Pellets": 1,
+    "Moderate Rain,Drizzle": 1,
+}
+RAW_WEATHER_COLUMNS = [
+    "Longitude (x)", "Latitude (y)", "Station Name", "Climate ID", "Date/Time (LST)",
+    "Year", "Month", "Day", "Time (LST)", "Temp (°C)", "Temp Flag", "Dew Point Temp (°C)",
+    "Dew Point Temp Flag", "Rel Hum (%)", "Rel Hum Flag", "Precip. Amount (mm)",
+    "Precip. Amount Flag", "Wind Dir (10s deg)", "Wind Dir Flag", "Wind Spd (km/h)",
+    "Wind Spd Flag", "Visibility (km)", "Visibility Flag", "Stn Press (kPa)", "Stn Press Flag",
+    "Hmdx", "Hmdx Flag", "Wind Chill", "Wind Chill Flag", "Weather",
+]
+
+
+def weather_chunk(rng, start, rows):
+    hours = np.arange(start, start + rows)
+    date_time = pl.from_epoch(pl.Series(WEATHER_START_SECOND + hours * 3600), time_unit="s")
+    day_of_year = hours / 24 % 365.25
+    temperature = (
+        7 - 17 * np.cos((day_of_year - 20) / 365.25 * 2 * np.pi)
+        - 4 * np.cos((hours % 24 - 3) / 24 * 2 * np.pi)
+        + rng.normal(0, 3, rows)
+    ).round(1)
+    conditions = np.array(list(WEATHER_CONDITIONS))
+    weights = np.array(list(WEATHER_CONDITIONS.values()), dtype=float)
+    weather = pl.Series(rng.choice(conditions, rows, p=weights / weights.sum()))
+    data = pl.DataFrame({
+        "date_time": date_time,
+        "temperature": temperature,
+        "weather": weather,
+    }).with_columns(
+        # It doesn't snow when it's warm.
+        pl.when((pl.col("temperature") > 2) & pl.col("weather").str.contains("Snow"))
+        .then(pl.col("weather").str.replace_all("Snow", "Rain"))
+        .otherwise(pl.col("weather"))
+    )
+    values = {
+        **{name: pl.lit(value) for name, value in STATION.items()},
+        "Date/Time (LST)": pl.col("date_time").dt.strftime("%Y-%m-%d %H:%M"),
+        "Year": pl.col("date_time").dt.strftime("%Y"),
+        "Month": pl.col("date_time").dt.strftime("%m"),
+        "Day": pl.col("date_time").dt.strftime("%d"),
+        "Time (LST)": pl.col("date_time").dt.strftime("%H:%M"),
+        "Temp (°C)": pl.col("temperature").cast(pl.String),
+        "Dew Point Temp (°C)": pl.Series((temperature - rng.gamma(2, 2, rows)).round(1)).cast(pl.String),
+        "Rel Hum (%)": pl.Series(rng.integers(20, 101, rows)).cast(pl.String),
+        "Wind Dir (10s deg)": pl.Series(rng.integers(1, 37, rows)).cast(pl.String),
+        "Wind Spd (km/h)": pl.Series(rng.gamma(2, 8, rows).round()).cast(pl.Int64).cast(pl.String),
+        "Visibility (km)": pl.Series(rng.uniform(0.2, 48.3, rows).round(1)).cast(pl.String),
+        "Stn Press (kPa)": pl.Series(rng.normal(100.9, 0.8, rows).round(2)).cast(pl.String),
+        "Weather": pl.col("weather"),
+    }
+    return data.select([values.get(name, pl.lit("")).alias(name) for name in RAW_WEATHER_COLUMNS])
+
+
+def write_weather_raw(path, rows, seed=0, chunk_rows=1_000_000):
+    """`rows` hours of raw weather, starting at 2012-01-01 00:00."""
+    with open(path, "wb") as f:
+        header = ",".join(f'"{name}"' for name in RAW_WEATHER_COLUMNS)
+        f.write(("\ufeff" + header + "\n").encode("utf-8"))
+        for start in range(0, rows, chunk_rows):
+            rng = np.random.default_rng([seed, start])
+            chunk = weather_chunk(rng, start, min(chunk_rows, rows - start))
+            chunk.write_csv(f, include_header=False, quote_style="always")
+
+
+# 311 service requests ------------------------------------------------------------
+
+COMPLAINT_TYPES = [
+    ("HEATING", "HPD"), ("GENERAL CONSTRUCTION", "HPD"), ("Street Light Condition", "DOT"),
+    ("DOF Literature Request", "DOF"), ("PLUMBING", "HPD"), ("PAINT - PLASTER", "HPD"),
+    ("Blocked Driveway", "NYPD"), ("NONCONST", "HPD"), ("Street Condition", "DOT"),
+    ("Illegal Parking", "NYPD"), ("Noise", "DEP"), ("Traffic Signal Condition", "DOT"),
+    ("Dirty Conditions", "DSNY"), ("Water System", "DEP"), ("Noise - Commercial", "NYPD"),
+    ("ELECTRIC", "HPD"), ("Broken Muni Meter", "DOT"), ("Noise - Street/Sidewalk", "NYPD"),
+    ("Sanitation Condition", "DSNY"), ("Rodent", "DOHMH"),
+]
+BOROUGHS = {
+    # borough: (probability, first three digits of its zip codes, cities)
+    "BROOKLYN": (0.31, ["112"], ["BROOKLYN"]),
+    "QUEENS": (0.23, ["113", "114", "116"], ["ASTORIA", "FLUSHING", "JAMAICA", "Long Island City"]),
+    "MANHATTAN": (0.22, ["100", "101", "102"], ["NEW YORK"]),
+    "BRONX": (0.18, ["104"], ["BRONX"]),
+    "STATEN ISLAND": (0.05, ["103"], ["STATEN ISLAND"]),
+    "Unspecified": (0.01, ["100"], ["NEW YORK"]),
+}
+# Messy zip codes as in the real data, with how often they replace a real zip code.
+MESSY_ZIPS = {
+    "": 0.03, "N/A": 0.01, "NO CLUE": 0.005, "0": 0.005, "00000": 0.005,
+    "77056": 0.001, "90210": 0.001, "29616-0759": 0.001, "83": 0.0005,
+}
+ZIP_PLUS_FOUR = 0.02
+STATUSES = ["Closed", "Open", "Assigned", "Pending", "Started"]
+
+
+def complaints_chunk(rng, start, rows, n_complaint_types=len(COMPLAINT_TYPES)):
+    # Complaint types follow a Zipf distribution, with a long tail of made up
+    # types when more than the 20 real ones are asked for.
+    types = COMPLAINT_TYPES + [
+        (f"Complaint Type {i}", "OTHER") for i in range(len(COMPLAINT_TYPES), n_complaint_types)
+    ]
+    type_index = (rng.zipf(1.3, rows) - 1) % len(types)
+    complaint_type = np.array([name for name, _ in types])[type_index]
+    agency = np.array([agency for _, agency in types])[type_index]
+
+    boroughs = list(BOROUGHS)
+    probabilities = np.array([BOROUGHS[borough][0] for borough in boroughs])
+    borough_index = rng.choice(len(boroughs), rows, p=probabilities / probabilities.sum())
+    # Lookup tables of (borough, choice) so prefixes and cities are picked per row.
+    prefixes = np.array([[BOROUGHS[b][1][i % len(BOROUGHS[b][1])] for i in range(3)] for b in boroughs])
+    cities = np.array([[BOROUGHS[b][2][i % len(BOROUGHS[b][2])] for i in range(4)] for b in boroughs])
+    prefix = prefixes[borough_index, rng.integers(0, 3, rows)]
+    city = cities[borough_index, rng.integers(0, 4, rows)]
+
+    zip_code = np.char.add(prefix, np.char.zfill(rng.integers(0, 100, rows).astype(str), 2))
+    plus_four = rng.random(rows) < ZIP_PLUS_FOUR
+    zip_code = np.where(
+        plus_four, np.char.add(np.char.add(zip_code, "-"), np.char.zfill(rng.integers(0, 10000, rows).astype(str), 4)),
+        zip_code,
+    ).astype(object)
+    messy = rng.random(rows)
+    threshold = 0.0
+    for value, probability in MESSY_ZIPS.items():
+        zip_code[(messy >= threshold) & (messy < threshold + probability)] = value
+        threshold += probability
+
+    created = COMPLAINTS_START_SECOND + rng.integers(0, 31 * 86400, rows)
+    closed = created + rng.exponential(3 * 86400, rows).astype(np.int64)
+    date_format = "%m/%d/%Y %I:%M:%S %p"
+    return pl.DataFrame({
+        "Unique Key": np.arange(26589651 + start, 26589651 + start + rows),
+        "Created Date": pl.from_epoch(pl.Series(created), time_unit="s").dt.strftime(date_format),
+        "Closed Date": pl.from_epoch(pl.Series(closed), time_unit="s").dt.strftime(date_format),
+        "Agency": agency,
+        "Complaint Type": complaint_type,
+        "Descriptor": np.char.add("Descriptor ", rng.integers(0, 10, rows).astype(str)),
+        "Incident Zip": pl.Series(zip_code, dtype=pl.String),
+        "City": city,
+        "Status": np.array(STATUSES)[rng.choice(len(STATUSES), rows, p=[0.8, 0.1, 0.05, 0.03, 0.02])],
+        "Borough": np.array(boroughs)[borough_index],
+        "Latitude": (40.7 + rng.normal(0, 0.08, rows)).round(6),
+        "Longitude": (-73.9 + rng.normal(0, 0.1, rows)).round(6),
+    }).with_columns(
+        # Blank zips are empty fields, like in the real export.
+        pl.col("Incident Zip").replace("", None)
+    )
+
+
+def write_complaints(path, rows, seed=0, chunk_rows=1_000_000, n_complaint_types=len(COMPLAINT_TYPES)):
+    with open(path, "wb") as f:
+        for start in range(0, rows, chunk_rows):
+            rng = np.random.default_rng([seed, start])
+            chunk = complaints_chunk(rng, start, min(chunk_rows, rows - start), n_complaint_types)
+            chunk.write_csv(f, include_header=start == 0)
+
+
+# Popularity contest --------------------------------------------------------------
+
+POPCON_TIME = 1387295813
+
+
+def popcon_chunk(rng, start, rows):
+    package = pl.Series(np.arange(start, start + rows)).cast(pl.String)
+    is_lib = rng.random(rows) < 0.6
+    no_files = rng.random(rows) < 0.4
+    atime = np.where(no_files, 0, POPCON_TIME - rng.integers(0, 3 * 365 * 86400, rows))
+    ctime = np.where(no_files, 0, POPCON_TIME - rng.integers(0, 5 * 365 * 86400, rows))
+    tag = np.array(["<OLD>", "<RECENT-CTIME>", ""])[rng.choice(3, rows, p=[0.45, 0.1, 0.45])]
+    data = pl.DataFrame({
+        "atime": atime,
+        "ctime": ctime,
+        "package": pl.Series(np.where(is_lib, "libpackage", "package")) + package,
+        "no_files": no_files,
+        "tag": pl.Series(tag).replace("", None),
+    })
+    return data.select(
+        pl.concat_str(
+            pl.col("atime"),
+            pl.col("ctime"),
+            pl.col("package"),
+            pl.when(pl.col("no_files")).then(pl.lit("<NOFILES>")).otherwise("/usr/bin/" + pl.col("package")),
+            pl.when(~pl.col("no_files")).then(pl.col("tag")),
+            separator=" ",
+            ignore_nulls=True,
+        ).alias("line")
+    )
+
+
+def write_popcon(path, rows, seed=0, chunk_rows=1_000_000):
+    host_id = np.random.default_rng(seed).bytes(16).hex()
+    with open(path, "wb") as f:
+        f.write(
+            f"POPULARITY-CONTEST-0 TIME:{POPCON_TIME} ID:{host_id} ARCH:amd64 POPCONVER:1.53ubuntu1\n".encode()
+        )
+        for start in range(0, rows, chunk_rows):
+            rng = np.random.default_rng([seed, start])
+            chunk = popcon_chunk(rng, start, min(chunk_rows, rows - start))
+            chunk.write_csv(f, include_header=False, quote_style="never")
+        f.write(f"END-POPULARITY-CONTEST-0 TIME:{POPCON_TIME}\n".encode())
+
+
+WRITERS = {
+    "bikes": write_bikes,
+    "weather": write_weather_raw,
+    "complaints": write_complaints,
+    "popcon": write_popcon,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", choices=WRITERS)
+    parser.add_argument("output")
+    parser.add_argument("--rows", type=lambda rows: int(rows.replace("_", "")), required=True,
+                        help="days for bikes, hours for weather, lines otherwise")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = datetime.now()
+    WRITERS[args.dataset](args.output, args.rows, seed=args.seed, chunk_rows=args.chunk_rows)
+    print(f"wrote {args.rows:,} rows to {args.output} in {(datetime.now() - start).total_seconds():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
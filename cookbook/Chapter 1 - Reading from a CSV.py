@@ -4,6 +4,10 @@ import matplotlib.pyplot as plt
 import polars as pl
 import matplotlib.dates as mdates
 
+# datasets.path finds the files in the data folder wherever the chapter is run from,
+# datasets.load parses them once and caches the result (see datasets.py)
+import datasets
+
 
 # %%
 # Reading data from a csv file
@@ -13,11 +17,11 @@ import matplotlib.dates as mdates
 
 # This dataset is a list of how many people were on 7 different bike paths in Montreal, each day.
 
-broken_df = pd.read_csv("../data/bikes.csv", encoding="ISO-8859-1")
+broken_df = pd.read_csv(datasets.path("bikes"), encoding="ISO-8859-1")
 
 
 # TODO: please load the data with the Polars library (do not forget to import Polars at the top of the script) and call it pl_broken_df
-pl_broken_df = pl.read_csv("../data/bikes.csv")
+pl_broken_df = pl.read_csv(datasets.path("bikes"))
 # %%
 # Look at the first 3 rows
 broken_df[:3]
@@ -34,7 +38,7 @@ pl_broken_df[:3]
 # * Set the index to be the 'Date' column
 
 fixed_df = pd.read_csv(
-    "../data/bikes.csv",
+    datasets.path("bikes"),
     sep=";",
     encoding="latin1",
     parse_dates=["Date"],
@@ -44,10 +48,11 @@ fixed_df = pd.read_csv(
 fixed_df[:3]
 
 # TODO: do the same (or similar) with polars
-pl_fixed_df = pl.read_csv("../data/bikes.csv", separator=';', encoding='latin1')
-
-#parse datetime and specify day comes first
-pl_fixed_df = pl_fixed_df.with_columns(pl.col("Date").str.strptime(pl.Date, "%d/%m/%Y").alias("Date"))
+# This is what datasets.read_bikes does:
+# pl.read_csv(path, separator=';', encoding='latin1'), then parse the day-first dates:
+# .with_columns(pl.col("Date").str.to_date("%d/%m/%Y"))
+# datasets.load only does it the first time, after that it memory-maps the cached result.
+pl_fixed_df = datasets.load("bikes")
 
 #set index  as Date column
 pl_fixed_df = pl_fixed_df.sort("Date")
@@ -69,9 +74,11 @@ pl_fixed_df["Berri 1"]
 fixed_df["Berri 1"].plot()
 
 # TODO: how would you do this with a Polars data frame?
-# use matplotlib to plot polars 
-berri_1_ls = pl_fixed_df["Berri 1"].to_list()
-plt.plot(pl_fixed_df['Date'].to_list(), berri_1_ls)
+# use matplotlib to plot polars
+# plot_frame hands NumPy views of the columns to matplotlib (no Python lists) and downsamples long series
+from plotting import plot_frame
+
+plot_frame(pl_fixed_df, "Date", ["Berri 1"])
 plt.title("polars - berri_1 plot")
 plt.show()
 
@@ -83,13 +90,8 @@ fixed_df.plot(figsize=(15, 10))
 
 # TODO: how would you do this with a Polars data frame? With Polars data frames you might have to use the Seaborn library and it mmight not work out of the box as with pandas.
 #plot entire dataframe
-#y are columns excluding Date
-columns_to_plot =  [col for col in pl_fixed_df.columns if col != 'Date']  # Replace with your column names
-for column in columns_to_plot:
-    plt.plot(pl_fixed_df['Date'].to_list() ,pl_fixed_df[column].to_list(), label=column)
-
-#set legend
+#y are all columns except Date, plot_frame also adds the legend
+plot_frame(pl_fixed_df, "Date", figsize=(15, 10))
 plt.title("polars - all columns plot")
-plt.legend(loc='upper left', bbox_to_anchor=(1, 1), fontsize=10)
 plt.show()
 # %%
@@ -3,10 +3,12 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import polars as pl
 
+import datasets
+
 # %%
 # We're going to use a new dataset here, to demonstrate how to deal with larger datasets. This is a subset of the of 311 service requests from [NYC Open Data](https://nycopendata.socrata.com/Social-Services/311-Service-Requests-from-2010-to-Present/erm2-nwe9).
 # because of mixed types we specify dtype to prevent any errors
-complaints = pd.read_csv("../data/311-service-requests.csv", dtype="unicode")
+complaints = pd.read_csv(datasets.path("complaints"), dtype="unicode")
 complaints.head()
 
 # %%
@@ -16,7 +18,16 @@ complaints.head()
 # see a discussion about dtype argument here: https://github.com/pola-rs/polars/issues/8230
 
 # in polars default datatype as string
-pl_complaints = pl.read_csv("../data/311-service-requests.csv", infer_schema_length=0)
+pl_complaints = pl.read_csv(datasets.path("complaints"), infer_schema_length=0)
+
+# %%
+# Reading everything as strings is wasteful, though: columns like Complaint Type or Borough only have a
+# few distinct values. complaints.py has a schema that loads those as categoricals, parses the dates
+# while reading and keeps messy columns like Incident Zip as strings.
+# datasets.load("complaints") runs read_complaints once and memory-maps the cached result afterwards.
+print(f"all strings: {pl_complaints.estimated_size('mb'):.1f} MB")
+pl_complaints = datasets.load("complaints")
+print(f"typed: {pl_complaints.estimated_size('mb'):.1f} MB")
 
 # %%
 # Selecting columns:
@@ -58,6 +69,21 @@ complaint_counts[:10]
 # TODO: rewrite the above using the polars library
 pl_complaints_count = pl_complaints["Complaint Type"].value_counts().sort("count", descending=True)
 top10 = pl_complaints_count[:10]
+
+# %%
+# Sorting every count to keep ten is more work than needed. top_values counts in a lazy query and keeps the
+# ten largest counts with top_k, a partial selection, so it also works on a scan of a file larger than memory.
+from complaints import scan_complaints
+from top_k import approx_top_values, top_values
+
+top10 = top_values(scan_complaints(datasets.path("complaints")), "Complaint Type").collect(engine="streaming")
+top10
+
+# %%
+# On a dump with millions of distinct values even the counts don't fit. approx_top_values reads the column
+# in batches into a Space-Saving sketch of 1000 counters. Every count is at most `error` too high, and
+# `guaranteed` says whether the type is certainly in the real top 10.
+approx_top_values(datasets.path("complaints"), "Complaint Type", capacity=1000)
 # %%
 # Plot the top 10 most common complaints
 complaint_counts[:10].plot(kind="bar")
@@ -70,9 +96,9 @@ plt.show()
 
 # %%
 # TODO: please do the same with Polars
-top_10_type = top10["Complaint Type"].to_list()
-top_10_count = top10["count"].to_list()
-plt.bar(top_10_type, top_10_count)
+from plotting import plot_bar
+
+plot_bar(top10, "Complaint Type", "count")
 plt.title("Top 10 Complaint Types in polars")
 plt.xlabel("Complaint Type")
 plt.ylabel("Count")
@@ -1,11 +1,10 @@
-import polars as pl
 import matplotlib.pyplot as plt
 
+import datasets
+
 # Load the data
-pl_complaints = pl.read_csv(
-    "../data/311-service-requests.csv",
-    dtype={"Complaint Type": pl.Utf8, "Borough": pl.Utf8}
-)
+# Complaint Type and Borough are loaded as categoricals, so the comparisons below compare codes, not strings
+pl_complaints = datasets.load("complaints")
 
 # 3.1 Selecting only noise complaints
 # Checking the first 5 rows
@@ -26,22 +25,31 @@ print(brooklyn_noise_complaints.select(
     ["Complaint Type", "Borough", "Created Date", "Descriptor"]
 ).head(10))
 
-# 3.3 So, which borough has the most noise complaints?
-noise_complaints = pl_complaints.filter(pl_complaints["Complaint Type"] == "Noise - Street/Sidewalk")
-noise_complaints_count = noise_complaints.groupby("Borough").count()
+# Every one of these filters reads all the rows. complaints_store writes the data as one Parquet file per
+# borough, sorted by Complaint Type, so a filter on both only reads the row groups that can match.
+# plan() shows which ones those are, from the Parquet footers alone. store() only (re)writes the store when it
+# is missing or the CSV changed.
+from complaints_store import plan, query, store
 
-# Counting total complaints by borough
-total_complaints_count = pl_complaints.groupby("Borough").count()
+store()
+brooklyn_noise = {"Borough": "BROOKLYN", "Complaint Type": "Noise - Street/Sidewalk"}
+for file_plan in plan(equals=brooklyn_noise):
+    print(f"{file_plan.path}: {len(file_plan.row_groups)} of {file_plan.total_row_groups} row groups")
+print(query(equals=brooklyn_noise, columns=["Complaint Type", "Borough", "Created Date", "Descriptor"]).head(10))
 
-# Calculate the ratio of noise complaints to total complaints for each borough
-# First, join noise_complaints_count and total_complaints_count on the "Borough" column
-ratios = noise_complaints_count.join(total_complaints_count, on="Borough", suffix="_total")
-ratios = ratios.with_column((pl.col("count") / pl.col("count_total")).alias("ratio"))
+# 3.3 So, which borough has the most noise complaints?
+# Instead of counting noise complaints and all complaints in two group-bys and joining them, we count
+# both in one pass: the number of noise complaints is the sum of the boolean `Complaint Type == ...`.
+# It is a lazy query, so with the streaming engine it also works on 311 files that don't fit in memory.
+from complaints import noise_ratio_by_borough, scan_complaints
+
+ratios = noise_ratio_by_borough(scan_complaints(datasets.path("complaints"))).collect(engine="streaming")
 
 # Plot the results
-# Convert the Polars DataFrame to Pandas for compatibility with Matplotlib
-ratios_df = ratios.select(["Borough", "ratio"]).to_pandas()
-ratios_df.set_index("Borough")["ratio"].plot(kind="bar")
+# plot_bar passes the columns to Matplotlib as NumPy arrays, no need to convert to pandas
+from plotting import plot_bar
+
+plot_bar(ratios, "Borough", "ratio")
 
 # Add plot labels and title
 plt.title("Noise Complaints by Borough (Normalized)")
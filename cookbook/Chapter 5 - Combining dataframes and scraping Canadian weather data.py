@@ -4,6 +4,8 @@ import polars as pl
 import matplotlib.pyplot as plt
 import numpy as np
 
+import datasets
+
 plt.style.use("ggplot")
 plt.rcParams["figure.figsize"] = (15, 3)
 plt.rcParams["font.family"] = "sans-serif"
@@ -13,14 +15,17 @@ plt.rcParams["font.family"] = "sans-serif"
 # By the end of this chapter, we're going to have downloaded all of Canada's weather data for 2012, and saved it to a CSV. We'll do this by downloading it one month at a time, and then combining all the months together.
 # Here's the temperature every hour for 2012!
 
-weather_2012_final = pd.read_csv("../data/weather_2012.csv", index_col="date_time")
+weather_2012_final = pd.read_csv(datasets.path("weather_2012"), index_col="date_time")
 weather_2012_final["temperature_c"].plot(figsize=(15, 6))
 plt.show()
 
 # Rewrite read_csv in polar
-weather_2012_final = pl.read_csv("../data/weather_2012.csv", try_parse_dates = False)
-plt.figure(figsize=(15,6))
-plt.plot(weather_2012_final["temperature_c"])
+# plot_frame downsamples the hourly series in Polars before handing it to matplotlib
+from plotting import plot_frame
+
+# datasets.load parses the CSV (date_time as a Datetime) the first time and memory-maps the cached copy afterwards
+weather_2012_final = datasets.load("weather_2012")
+plot_frame(weather_2012_final, "date_time", ["temperature_c"], figsize=(15, 6))
 plt.show()
 
 # %%
@@ -179,46 +184,36 @@ temperatures.groupby("Hour").aggregate(np.median).plot()
 plt.show()
 
 # Polars get median of temperature in each hour
-temperatures_polars = weather_mar2012_polars[["temperature_c"]].clone()
-temperatures_polars = temperatures_polars.with_columns((weather_mar2012_polars['date_time'].dt.hour()).alias('hour'))
+from calendar_features import hour
+
+temperatures_polars = weather_mar2012_polars.select("temperature_c", hour("date_time"))
 print(temperatures_polars)
 # Plot Polars dataframe
-plt.plot(temperatures_polars.group_by("hour", maintain_order=True).median()['temperature_c'])
+plt.plot(temperatures_polars.group_by("hour").median().sort("hour")['temperature_c'])
 plt.show()
 # So it looks like the time with the highest median temperature is 2pm. Neat.
 
+# %%
+# The weather cube (time_cube.py) keeps a temperature histogram per (year, month, weekday, hour), so the
+# hourly medians for March come out of it without looking at the hourly rows again:
+from time_cube import cube
+
+print(cube("weather_2012").query(["month", "hour"], ["temperature_c"]).filter(pl.col("month") == 3))
+
 # %%
 # %%
 # Okay, so what if we want the data for the whole year? Ideally the API would just let us download that, but I couldn't figure out a way to do that.
 # First, let's put our work from above into a function that gets the weather for a given month.
 
 
-def clean_data(data):
-    data = data.dropna(axis=1, how="any")
-    data = data.drop(["Year", "Month", "Day", "Time (LST)"], axis=1)
-    data.columns = data.columns.str.replace('ï»¿"', "")
-    data.columns = data.columns.str.replace("Â", "")
-    data = data.rename(
-        columns={
-            "Longitude (x)": "Longitude",
-            "Latitude (y)": "Latitude",
-            "Station Name": "Station_Name",
-            "Climate ID": "Climate_ID",
-            "Temp (°C)": "Temperature_C",
-            "Dew Point Temp (°C)": "Dew_Point_Temp_C",
-            "Rel Hum (%)": "Relative_Humidity",
-            "Wind Spd (km/h)": "Wind_Speed_kmh",
-            "Visibility (km)": "Visibility_km",
-            "Stn Press (kPa)": "Station_Pressure_kPa",
-            "Weather": "Weather",
-        }
-    )
-    data.columns = data.columns.str.lower()
-    data.index.name = "date_time"
-    return data
+# clean_data does all the cleaning steps from above at once. It lives in weather.py next to
+# its Polars counterpart, clean_data_pl.
+from weather import clean_data
 
 
-def download_weather_month(year, month):
+def download_weather_month(year, month, cache=None):
+    if cache is not None:
+        return cache.get_pandas(WeatherKey(5415, year, month, 1), lambda: download_weather_month(year, month))
     url_template = "http://climate.weather.gc.ca/climate_data/bulk_data_e.html?format=csv&stationID=5415&Year={year}&Month={month}&timeframe=1&submit=Download+Data"
     url = url_template.format(year=year, month=month)
     weather_data = pd.read_csv(
@@ -228,63 +223,82 @@ def download_weather_month(year, month):
     return weather_data_clean
 
 # TODO: redefine these functions using polars and your code above
-def clean_data_pl(data):
-    df = data.with_columns(
-        pl.when(pl.col(pl.String).str.len_chars() == 0)
-        .then(None)
-        .otherwise(pl.col(pl.String))
-        .name.keep())
-    filter_col = df.select(pl.all().is_null().any()).unpivot().filter(pl.col('value')==False).select('variable').to_series().to_list()
-    data = df.select(filter_col)
-    data = data.drop(pl.col(["Year", "Month", "Day", "Time (LST)"]))
-    data = data.rename(lambda column_name: column_name.replace('ï»¿"', ""))
-    data = data.rename(lambda column_name: column_name.replace( "Â", ""))
-    data = data.rename(
-        {"Date/Time (LST)": "Date_time",
-        'Longitude (x)"': "Longitude",
-         "Latitude (y)": "Latitude",
-        "Station Name": "Station_Name",
-        "Climate ID": "Climate_ID",
-        "Temp (°C)": "Temperature_C",
-        "Dew Point Temp (°C)": "Dew_Point_Temp_C",
-        "Rel Hum (%)": "Relative_Humidity",
-        "Wind Spd (km/h)": "Wind_Speed_kmh",
-        "Visibility (km)": "Visibility_km",
-        "Stn Press (kPa)": "Station_Pressure_kPa",
-        "Weather": "Weather"})
-    data = data.select(pl.all().name.to_lowercase())
-    data = data.select(['date_time', 'longitude', 'latitude', 'station_name', 'climate_id', 
-    'temperature_c', 'dew_point_temp_c', 'relative_humidity', 'wind_speed_kmh', 'visibility_km', 
-    'station_pressure_kpa','weather'])
-    return data
+# The Polars versions (clean_data_pl and download_weather_month_pl) live in weather.py so
+# other chapters can reuse them. clean_data_pl cleans the header once on the schema instead
+# of renaming the data several times, and works out the columns without nulls in one pass.
+from weather import fetch_weather_months
+
+# %%
+# Historical months never change, so there is no need to download them on every run.
+# A WeatherCache keeps every cleaned month on disk (keyed by station, year, month and timeframe),
+# only re-downloads the current month and evicts the least recently used months when it gets too big.
+from weather_cache import WeatherCache, WeatherKey
+
+weather_cache = WeatherCache(max_bytes=256 * 2**20)
 
-def download_weather_month_pl(year, month):
-    url_template = "http://climate.weather.gc.ca/climate_data/bulk_data_e.html?format=csv&stationID=5415&Year={year}&Month={month}&timeframe=1&submit=Download+Data"
-    url = url_template.format(year=year, month=month)
-    weather_data = pl.read_csv(
-        url,
-        try_parse_dates=True,
-        encoding="latin1",
-        has_header=True)
-    weather_data_clean = clean_data_pl(weather_data)
-    return weather_data_clean
 # %%
 download_weather_month(2012, 1)[:5]
 # %%
 # Now, let's use a list comprehension to download all our data and then just concatenate these data frames
 # This might take a while
-data_by_month = [download_weather_month(2012, i) for i in range(1, 13)]
+data_by_month = [download_weather_month(2012, i, cache=weather_cache) for i in range(1, 13)]
 weather_2012 = pd.concat(data_by_month)
 weather_2012.head()
 
 # TODO: do the same with polars
-data_by_month = [download_weather_month_pl(2012, i) for i in range(1, 13)]
-weather_mar2012_polars = pl.concat(data_by_month)
+# The list comprehension `pl.concat([download_weather_month_pl(2012, i) for i in range(1, 13)])`
+# downloads the months one after another. fetch_weather_months downloads them concurrently over a
+# shared keep-alive connection pool (with retries), parses each month as soon as it arrives and
+# returns the same frame.
+weather_mar2012_polars = fetch_weather_months(
+    [(2012, i) for i in range(1, 13)], max_workers=6, cache=weather_cache
+)
 weather_mar2012_polars.head()
 
+# Run this cell twice: the second time everything comes from the cache.
+print(weather_cache.stats)
+
 # %%
 # Now, let's save the data.
-weather_2012.to_csv("../data/weather_2012.csv")
+weather_2012.to_csv(datasets.path("weather_2012"))
 
 # TODO: use polars to save the data.
-weather_mar2012_polars.write_csv("../data/weather_2012.csv", separator=",")
+# The contents change, so the next datasets.load("weather_2012") parses it again.
+weather_mar2012_polars.write_csv(datasets.path("weather_2012"), separator=",")
+
+# %%
+# Above we kept all twelve months in memory before writing them. For many station-years that doesn't scale:
+# build_weather_file appends every month to the file as soon as it is downloaded, so only a few months are
+# in memory at any time. The Parquet file has one row group (with min/max statistics) per month.
+from weather_build import build_weather_file
+
+build_weather_file(
+    [(2012, i) for i in range(1, 13)], datasets.DATA_DIR / "weather_2012.parquet", cache=weather_cache
+)
+pl.scan_parquet(datasets.DATA_DIR / "weather_2012.parquet").filter(pl.col("date_time").dt.month() == 3).collect().head()
+
+# %%
+# A single CSV has to be parsed completely every time we want to look at it. Instead, we can also store
+# the data in a Parquet "warehouse" with one file per station and month
+# (data/weather_warehouse/station=5415/year=2012/month=3/data.parquet).
+import weather_warehouse
+
+weather_warehouse.ingest_frame(weather_mar2012_polars)
+
+# Filters on station/year/month only open the matching files, so this reads just one file:
+weather_warehouse.scan_weather().filter(
+    (pl.col("year") == 2012) & (pl.col("month") == 12)
+).select(pl.col("temperature_c").median()).collect()
+
+# For the nightly rebuild, ingest_months downloads only the months that are not in the warehouse yet.
+weather_warehouse.ingest_months([(2012, i) for i in range(1, 13)], cache=weather_cache)
+
+# %%
+# The repository also has a small SQLite database, data/weather_2012.sqlite, with a weather_2012(id, date_time, temp)
+# table. weather_sqlite.py writes our temperatures to a copy of it in data/cache (the original is only read) in big
+# transactions and reads them back in batches; queries on a date range use an index on date_time instead of reading
+# everything.
+import weather_sqlite
+
+weather_sqlite.write_weather(weather_mar2012_polars, replace=True)
+weather_sqlite.read_weather("2012-03-01", "2012-04-01", path=weather_sqlite.WRITE_PATH).head()
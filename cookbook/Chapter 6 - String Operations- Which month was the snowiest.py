@@ -4,6 +4,8 @@ import polars as pl
 import matplotlib.pyplot as plt
 import numpy as np
 
+import datasets
+
 plt.style.use("ggplot")
 plt.rcParams["figure.figsize"] = (15, 3)
 plt.rcParams["font.family"] = "sans-serif"
@@ -12,15 +14,26 @@ plt.rcParams["font.family"] = "sans-serif"
 # %%
 # We saw earlier that pandas is really good at dealing with dates. It is also amazing with strings! We're going to go back to our weather data from Chapter 5, here.
 weather_2012 = pd.read_csv(
-    "../data/weather_2012.csv", parse_dates=True, index_col="date_time"
+    datasets.path("weather_2012"), parse_dates=True, index_col="date_time"
 )
 weather_2012[:5]
 
 # %%
 # Load the data using polars and call the data frame pl_wather_2012
-pl_weather_2012 = pl.read_csv("../data/weather_2012.csv", try_parse_dates = True)
+# Instead of parsing the whole CSV again we scan the Parquet warehouse written in Chapter 5
+# (the CSV is ingested the first time, and again whenever it changes). Polars only reads the files and
+# columns a query needs.
+import weather_warehouse
+
+weather_warehouse.ingest_dataset("weather_2012")
+pl_weather_2012_lazy = weather_warehouse.scan_weather().filter(pl.col("year") == 2012)
+pl_weather_2012 = pl_weather_2012_lazy.collect()
 pl_weather_2012.head()
 
+# %%
+# Median temperature in December 2012: only station=5415/year=2012/month=12 is read.
+pl_weather_2012_lazy.filter(pl.col("month") == 12).select(pl.col("temperature_c").median()).collect()
+
 # %%
 # You'll see that the 'Weather' column has a text description of the weather that was going on each hour. We'll assume it's snowing if the text description contains "Snow".
 # Pandas provides vectorized string functions, to make it easy to operate on columns containing text. There are some great examples: "http://pandas.pydata.org/pandas-docs/stable/basics.html#vectorized-string-methods" in the documentation.
@@ -39,6 +52,18 @@ pl_is_snowing = pl_weather_2012.select(
     pl.col("weather").str.contains("Snow").cast(pl.Float32))
 plt.plot(pl_is_snowing["weather"])
 
+# %%
+# There are only a few dozen different weather descriptions, but str.contains looks at all 8784 of them.
+# As an Enum, every description is stored once and each hour just points at it, so we can check every
+# condition once per description and look the answer up for each hour.
+from weather_conditions import encode_weather, flag_table, with_condition_flags
+
+pl_weather_2012 = encode_weather(pl_weather_2012)
+print(flag_table(pl_weather_2012.schema["weather"]))
+
+pl_weather_conditions = with_condition_flags(pl_weather_2012).select(pl.col("date_time"), pl.col("^is_.*$"))
+pl_weather_conditions.select(pl.col("^is_.*$").mean())
+
 # %%
 # If we wanted the median temperature each month, we could use the `resample()` method like this:
 weather_2012["temperature_c"].resample("M").apply(np.median).plot(kind="bar")
@@ -48,11 +73,30 @@ plt.show()
 
 # %%
 # Polars aggregate monthly temperature median
-pl_temperature_median = pl_weather_2012.group_by_dynamic("date_time", every="1mo", period="1mo").agg(
+pl_temperature_median = pl_weather_2012_lazy.sort("date_time").group_by_dynamic("date_time", every="1mo", period="1mo").agg(
     pl.col("temperature_c").median()
-)
+).collect()
+# A new figure: the current axes still hold pandas' monthly bar chart, which can't take these dates
+plt.figure()
 plt.bar(pl_temperature_median['date_time'], pl_temperature_median['temperature_c'], width=15)
 
+# %%
+# For a single year we can also just group by the name of the month. month_name is an Enum,
+# so the months sort in calendar order.
+# plot_bar draws on a new figure, not on the date axes of the chart above.
+from calendar_features import month_name
+from plotting import plot_bar
+
+pl_temperature_median_by_name = (
+    pl_weather_2012_lazy.group_by(month_name("date_time"))
+    .agg(pl.col("temperature_c").median())
+    .sort("month_name")
+    .collect()
+)
+plot_bar(pl_temperature_median_by_name, "month_name", "temperature_c")
+plt.xticks(rotation=45)
+plt.show()
+
 # %%
 # So we can think of snowiness as being a bunch of 1s and 0s instead of `True`s and `False`s:
 is_snowing.astype(float)[:10]
@@ -65,10 +109,32 @@ plt.show()
 
 # %%
 
-# Polars agg mean of snowness
-pl_snowing_monthly_mean = pl_is_snowing.group_by_dynamic("date_time", every="1mo", period="1mo").agg(
-    pl.col("weather").mean()
-)
-plt.bar(pl_snowing_monthly_mean['date_time'], pl_snowing_monthly_mean['weather'], width=15)
+# Polars agg mean of snowness, using the snow flag computed per weather description
+pl_snowing_monthly_mean = pl_weather_conditions.sort("date_time").group_by_dynamic(
+    "date_time", every="1mo", period="1mo"
+).agg(pl.col("is_snow").mean())
+plt.figure()
+plt.bar(pl_snowing_monthly_mean['date_time'], pl_snowing_monthly_mean['is_snow'], width=15)
 
+# %%
+# In production new hours arrive every day, and recomputing these monthly numbers over years of history each time is
+# wasteful. WeatherAggregates keeps per-month counts, sums and a temperature histogram, and only updates the months
+# that new rows fall into. Let's pretend December arrives after the rest of the year:
+from weather_aggregates import WeatherAggregates, exact_aggregates
+
+aggregates = WeatherAggregates()
+aggregates.update(pl_weather_2012.filter(pl.col("month") < 12))
+print(aggregates.update(pl_weather_2012.filter(pl.col("month") == 12)))  # only one month (and 31 days) touched
+print(aggregates.result("month"))
+
+# The incremental medians, means and snowiness are the same as recomputing everything:
+print(exact_aggregates(pl_weather_2012, "month"))
+
+# %%
+# Or, when the data doesn't change between questions, aggregate it once per (year, month, weekday, hour)
+# and roll that up. The cube is saved next to the data and only rebuilt when weather_2012.csv changes.
+from time_cube import cube
 
+weather_cube = cube("weather_2012")
+print(weather_cube.query(["month"]))  # temperature_c_median and snow_mean are the numbers from above
+print(weather_cube.query(["weekday", "hour"], ["snow"]))
@@ -5,6 +5,8 @@ import polars as pl
 import matplotlib.pyplot as plt
 import numpy as np
 
+import datasets
+
 # Make the graphs a bit prettier, and bigger
 plt.style.use("ggplot")
 plt.rcParams["figure.figsize"] = (15, 5)
@@ -19,7 +21,7 @@ dtypes = {
     "Request Date": pl.Date,  # Set as Date type
     "Number of Requests": pl.Int32  # Set as 32-bit integer
 }
-requests = pl.read_csv(r"C:/Users\psingh\Desktop\pandas_to_polars_cookbook\data\311-service-requests.csv", dtypes=dtypes)
+requests = pl.read_csv(datasets.path("complaints"), schema_overrides=dtypes)
 requests.head()
 
 
@@ -52,12 +54,25 @@ requests.select(pl.col("Incident Zip").unique())
 
 # TODO: what's the Polars command for this?
 
+# %%
+# On a big file every one of these looks is another pass over the data. profile_columns looks at every column
+# in a single pass instead: null-like tokens, the shapes of the values (digits as 9, so `99999-9999` is a
+# ZIP+4 code), the lengths and the approximate number of distinct values.
+from column_profile import profile_columns, suggest_read_options
+
+profile = profile_columns(datasets.path("complaints"))
+print(profile.filter(pl.col("column") == "Incident Zip").explode("shapes").unnest("shapes"))
+
+# From that it suggests what this chapter works out by hand below: which tokens are nulls and which dtypes to use.
+read_options = suggest_read_options(profile)
+print(read_options["null_values"], read_options["schema_overrides"].get("Incident Zip"))
+
 # %%
 # Fixing the nan values and string/float confusion
 # We can pass a `na_values` option to `pd.read_csv` to clean this up a little bit. We can also specify that the type of Incident Zip is a string, not a float.
 null_values = ["NO CLUE", "N/A", "0"]
 requests = pl.read_csv(
-    r"C:/Users\psingh\Desktop\pandas_to_polars_cookbook\data\311-service-requests.csv", null_values=null_values, dtypes=dtypes
+    datasets.path("complaints"), null_values=null_values, schema_overrides=dtypes
 )
 requests.select(pl.col("Incident Zip").unique())
 
@@ -197,6 +212,11 @@ city_counts = requests.select(pl.col("City").value_counts())
 # Display the result
 print(city_counts)
 
+# Only the most common cities, without sorting all the counts
+from top_k import top_values
+
+print(top_values(requests, "City").collect())
+
 
 # It looks like these are legitimate complaints, so we'll just leave them alone.
 
@@ -231,6 +251,25 @@ unique_zips = requests.select(pl.col("Incident Zip").unique())
 # Display the result
 print(unique_zips)
 
+# %%
+# All of the above reads the file twice and makes a pass over the data for every fix. complaints.py has the
+# same cleaning as a single expression: null tokens, ZIP+4 truncation and 00000 are handled together,
+# and the near/far classification from above is added in the same pass. Because it runs on a lazy scan with
+# the streaming engine, it reads the file once and also works on 311 files much bigger than memory.
+from complaints import clean_zip_codes, scan_complaints
+
+clean_requests = clean_zip_codes(scan_complaints(datasets.path("complaints")))
+zip_summary = (
+    clean_requests.group_by("zip_region", "Incident Zip")
+    .agg(pl.len())
+    .sort("zip_region", "Incident Zip")
+    .collect(engine="streaming")
+)
+print(zip_summary)
+
+# To keep the cleaned data, stream it to Parquet instead of collecting it:
+# clean_requests.sink_parquet(datasets.DATA_DIR / "311-service-requests-clean.parquet")
+
 
 # TODO: please implement this with Polars
 
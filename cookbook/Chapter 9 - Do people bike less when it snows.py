@@ -0,0 +1,56 @@
+# %%
+import polars as pl
+import matplotlib.pyplot as plt
+
+import datasets
+from plotting import plot_bar
+
+plt.style.use("ggplot")
+plt.rcParams["figure.figsize"] = (15, 5)
+plt.rcParams["font.family"] = "sans-serif"
+
+# %%
+# The bike counts from Chapters 1 and 4 are for Montréal in 2012, and so is the weather from Chapters 5 and 6.
+# Let's put them together. Both come out of datasets.load sorted by date.
+bikes = datasets.load("bikes").set_sorted("Date")
+weather = datasets.load("weather_2012", columns=["date_time", "temperature_c", "weather"])
+
+# %%
+# First the weather per day. group_by_dynamic needs the hours sorted and walks through them in order.
+# There are no precipitation amounts in the data, so we use the fraction of hours with rain, drizzle or snow.
+from bikes_weather import bikes_with_weather, daily_weather
+
+daily = daily_weather(weather)
+daily.head()
+
+# %%
+# Joining on the date: both sides are flagged as sorted, so join_asof merges them instead of building a hash
+# table. A tolerance of zero days keeps exact matches only.
+# bikes_with_weather joins the 366 days first and only then turns every counter into its own rows.
+rides = bikes_with_weather(bikes, daily)
+rides.head()
+
+# %%
+# Average cyclists per counter on days with and without snow
+snowy = (
+    rides.group_by("counter", (pl.col("snow_fraction") > 0).alias("snow"))
+    .agg(pl.col("count").mean())
+    .pivot("snow", index="counter", values="count")
+    .rename({"false": "no snow", "true": "snow"})
+    .select("counter", "no snow", "snow")  # the pivot's columns come in group order
+    .sort("counter")
+)
+print(snowy)
+
+# %%
+# And per degree of the day's mean temperature, on Berri 1
+by_temperature = (
+    rides.filter(pl.col("counter") == "Berri 1")
+    .group_by(pl.col("temperature_mean").round().cast(pl.Int32))
+    .agg(pl.col("count").mean())
+    .sort("temperature_mean")
+)
+plot_bar(by_temperature, "temperature_mean", "count")
+plt.title("Berri 1: average cyclists per day by mean temperature")
+plt.xlabel("Mean temperature (°C)")
+plt.show()
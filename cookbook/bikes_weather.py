@@ -0,0 +1,79 @@
+"""Daily bike counts next to the day's weather (Chapter 9).
+
+The hourly weather is aggregated to days with `group_by_dynamic`, which
+walks the sorted `date_time` column instead of hashing it. Both sides are
+then sorted by date, so they are joined with `join_asof`: a merge of two
+sorted columns, which uses the sortedness flags (`set_sorted`) instead of
+building a hash table. A tolerance of zero days keeps exact date matches
+only, so a day without weather gets nulls, as with a left join.
+
+The bike counts can be wide (one column per counter, as in bikes.csv) or
+long (`Date, counter, count`, sorted by Date) for thousands of counters.
+Wide counts are joined first and unpivoted afterwards, so the join only
+sees one row per day however many counters there are.
+
+The weather data has no precipitation amounts, so precipitation is the
+fraction of hours with rain, drizzle or snow.
+"""
+import polars as pl
+
+from weather_conditions import condition_flag, encode_weather
+
+DAILY_WEATHER_COLUMNS = [
+    "hours",
+    "temperature_mean",
+    "temperature_min",
+    "temperature_max",
+    "precipitation_fraction",
+    "rain_fraction",
+    "snow_fraction",
+]
+
+
+def daily_weather(weather):
+    """Per day: hours of data, mean/min/max temperature and the fraction of hours with
+    precipitation, rain and snow. `weather` has date_time, temperature_c and weather."""
+    weather = encode_weather(weather.lazy().select("date_time", "temperature_c", "weather"))
+    dtype = weather.collect_schema()["weather"]
+    snow, rain, drizzle = (condition_flag(dtype, condition) for condition in ("Snow", "Rain", "Drizzle"))
+    return (
+        weather.sort("date_time")
+        .group_by_dynamic("date_time", every="1d")
+        .agg(
+            pl.len().alias("hours"),
+            pl.col("temperature_c").mean().alias("temperature_mean"),
+            pl.col("temperature_c").min().alias("temperature_min"),
+            pl.col("temperature_c").max().alias("temperature_max"),
+            (snow | rain | drizzle).mean().alias("precipitation_fraction"),
+            rain.mean().alias("rain_fraction"),
+            snow.mean().alias("snow_fraction"),
+        )
+        .select(pl.col("date_time").cast(pl.Date).alias("date"), *DAILY_WEATHER_COLUMNS)
+        .collect()
+        .set_sorted("date")
+    )
+
+
+def join_daily_weather(counts, daily, date_column="Date"):
+    """`counts` with the day's weather from `daily_weather`, sorted by `date_column`.
+
+    Sorting is free when `counts` is flagged as sorted by `date_column`
+    (`set_sorted`, or the output of a sort), otherwise it is sorted first.
+    A day without weather gets nulls.
+    """
+    return counts.sort(date_column).join_asof(
+        daily, left_on=date_column, right_on="date", strategy="backward", tolerance="0d"
+    ).drop("date")
+
+
+def bikes_with_weather(bikes, daily, counters=None, date_column="Date"):
+    """Long `Date, counter, count` rows of the (wide) `bikes` frame with the day's weather.
+
+    `counters` defaults to every integer column of `bikes`.
+    """
+    if counters is None:
+        counters = [name for name, dtype in bikes.schema.items() if dtype.is_integer()]
+    wide = join_daily_weather(bikes.select(date_column, *counters), daily, date_column)
+    return wide.unpivot(
+        counters, index=[date_column, *DAILY_WEATHER_COLUMNS], variable_name="counter", value_name="count"
+    ).sort(date_column, "counter")
@@ -0,0 +1,73 @@
+"""Calendar features as native Polars expressions.
+
+Every function takes the name of a Date/Datetime column and returns an
+expression, so it can be used in `with_columns`, `group_by`, ... without
+calling back into Python for every row. Names of weekdays, months and seasons
+are Enums, which sort in calendar order instead of alphabetically.
+"""
+import polars as pl
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+SEASONS = ["Winter", "Spring", "Summer", "Autumn"]
+
+WEEKDAY = pl.Enum(WEEKDAYS)
+MONTH = pl.Enum(MONTHS)
+SEASON = pl.Enum(SEASONS)
+
+
+def _lookup(names, dtype, index):
+    # Gathering from a literal Series stays in the engine, unlike mapping a dict in Python.
+    return pl.lit(pl.Series(names, dtype=dtype)).gather(index)
+
+
+def weekday_name(column):
+    # Polars weekdays are 1 (Monday) to 7 (Sunday).
+    return _lookup(WEEKDAYS, WEEKDAY, pl.col(column).dt.weekday() - 1).alias("weekday_name")
+
+
+def month_name(column):
+    return _lookup(MONTHS, MONTH, pl.col(column).dt.month() - 1).alias("month_name")
+
+
+def season(column):
+    """Meteorological season: December to February is winter, and so on."""
+    return _lookup(SEASONS, SEASON, pl.col(column).dt.month() % 12 // 3).alias("season")
+
+
+def hour(column):
+    return pl.col(column).dt.hour().alias("hour")
+
+
+def iso_week(column):
+    return pl.col(column).dt.week().alias("iso_week")
+
+
+def is_weekend(column):
+    return (pl.col(column).dt.weekday() >= 6).alias("is_weekend")
+
+
+FEATURES = {
+    "weekday_name": weekday_name,
+    "month_name": month_name,
+    "season": season,
+    "hour": hour,
+    "iso_week": iso_week,
+    "is_weekend": is_weekend,
+}
+
+# The features that also work on Date columns (hour needs a Datetime).
+TIME_FEATURES = ["hour"]
+DATE_FEATURES = [feature for feature in FEATURES if feature not in TIME_FEATURES]
+
+
+def calendar_features(column, features=tuple(FEATURES)):
+    """Expressions for several features at once, e.g.
+    `df.with_columns(calendar_features("Date", ["weekday_name", "is_weekend"]))`.
+
+    The default is every feature, for Datetime columns; use DATE_FEATURES
+    for Date columns."""
+    return [FEATURES[feature](column) for feature in features]
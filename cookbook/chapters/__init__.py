@@ -0,0 +1,43 @@
+"""The cookbook chapters as importable modules, for running them headless.
+
+The chapter scripts next to this folder are meant to be read and run cell by
+cell, so they import pandas, matplotlib and numpy up front. The modules here
+contain the same recipes, but only import Polars (and the cookbook helpers)
+when they are imported:
+
+* the Polars recipes are plain functions
+* `pandas_reference` functions import pandas when they are called
+* `plot_*` functions import matplotlib when they are called, with the Agg
+  backend when there is no display (see plotting.pyplot)
+
+Every module has a `run(plot=False, reference=False)` that runs the chapter
+and returns its results in a dict:
+
+    python -c "import chapters; print(chapters.run(4))"
+
+`benchmarks/import_times.py` compares their import time with the chapter
+scripts' imports.
+"""
+import importlib
+
+CHAPTERS = {
+    1: "chapters.reading_csv",
+    2: "chapters.complaint_types",
+    3: "chapters.noise_complaints",
+    4: "chapters.weekday_cycling",
+    5: "chapters.weather_download",
+    6: "chapters.snowiest_month",
+    7: "chapters.messy_zips",
+    8: "chapters.timestamps",
+}
+
+
+def module(chapter):
+    try:
+        return importlib.import_module(CHAPTERS[chapter])
+    except KeyError:
+        raise ValueError(f"unknown chapter {chapter!r}, use one of {sorted(CHAPTERS)}") from None
+
+
+def run(chapter, plot=False, reference=False):
+    return module(chapter).run(plot=plot, reference=reference)
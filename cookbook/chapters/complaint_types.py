@@ -0,0 +1,35 @@
+"""Chapter 2: the most common 311 complaint types."""
+
+import datasets
+from top_k import top_values
+
+
+def top_complaint_types(complaints, n=10):
+    return top_values(complaints, "Complaint Type", n).collect()
+
+
+def pandas_reference(n=10):
+    import pandas as pd
+
+    complaints = pd.read_csv(datasets.path("complaints"), dtype="unicode")
+    return complaints["Complaint Type"].value_counts()[:n]
+
+
+def plot_complaint_types(counts):
+    from plotting import plot_bar, pyplot
+
+    figure, ax = plot_bar(counts, "Complaint Type", "count")
+    ax.set_title("Top 10 Complaint Types")
+    pyplot().setp(ax.get_xticklabels(), rotation=45, ha="right")
+    figure.tight_layout()
+    return figure
+
+
+def run(plot=False, reference=False):
+    complaints = datasets.load("complaints", columns=["Complaint Type"])
+    results = {"top_complaint_types": top_complaint_types(complaints)}
+    if reference:
+        results["pandas"] = pandas_reference()
+    if plot:
+        results["figure"] = plot_complaint_types(results["top_complaint_types"])
+    return results
@@ -0,0 +1,52 @@
+"""Chapter 7: cleaning up the messy 311 zip codes."""
+import polars as pl
+
+import datasets
+from column_profile import profile_columns, suggest_read_options
+from complaints import ZIP_NULL_TOKENS, clean_zip_codes, scan_complaints
+from top_k import top_values
+
+
+def zip_summary(path=None):
+    """Complaints per cleaned zip code and near/far region, in one streaming pass."""
+    complaints = scan_complaints(path or datasets.path("complaints"))
+    return (
+        clean_zip_codes(complaints)
+        .group_by("zip_region", "Incident Zip")
+        .agg(pl.len())
+        .sort("zip_region", "Incident Zip")
+        .collect(engine="streaming")
+    )
+
+
+def suggested_read_options(path=None):
+    """The null values and dtypes the one-pass profile suggests for the 311 export."""
+    return suggest_read_options(profile_columns(path or datasets.path("complaints")))
+
+
+def top_cities(path=None, n=10):
+    """The `n` most common (uppercased) cities, in one streaming pass."""
+    complaints = scan_complaints(path or datasets.path("complaints"))
+    cities = complaints.select(pl.col("City").cast(pl.String).str.to_uppercase())
+    return top_values(cities, "City", n).collect(engine="streaming")
+
+
+def pandas_reference():
+    import numpy as np
+    import pandas as pd
+
+    requests = pd.read_csv(datasets.path("complaints"), na_values=ZIP_NULL_TOKENS, dtype="unicode")
+    zip_codes = requests["Incident Zip"].str.slice(0, 5)
+    return zip_codes.where(zip_codes != "00000", np.nan).unique()
+
+
+def run(plot=False, reference=False):
+    # Nothing to plot in this chapter.
+    results = {
+        "read_options": suggested_read_options(),
+        "zip_summary": zip_summary(),
+        "top_cities": top_cities(),
+    }
+    if reference:
+        results["pandas"] = pandas_reference()
+    return results
@@ -0,0 +1,35 @@
+"""Chapter 3: which borough has the most noise complaints."""
+import datasets
+from complaints import noise_ratio_by_borough, scan_complaints
+
+
+def noise_ratios(path=None, complaint_type="Noise - Street/Sidewalk"):
+    complaints = scan_complaints(path or datasets.path("complaints"))
+    return noise_ratio_by_borough(complaints, complaint_type).collect(engine="streaming")
+
+
+def pandas_reference(complaint_type="Noise - Street/Sidewalk"):
+    import pandas as pd
+
+    complaints = pd.read_csv(datasets.path("complaints"), dtype="unicode")
+    noise_complaints = complaints[complaints["Complaint Type"] == complaint_type]
+    return noise_complaints["Borough"].value_counts() / complaints["Borough"].value_counts()
+
+
+def plot_noise_ratios(ratios):
+    from plotting import plot_bar
+
+    figure, ax = plot_bar(ratios, "Borough", "ratio")
+    ax.set_title("Noise Complaints by Borough (Normalized)")
+    ax.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    return figure
+
+
+def run(plot=False, reference=False):
+    results = {"noise_ratios": noise_ratios()}
+    if reference:
+        results["pandas"] = pandas_reference()
+    if plot:
+        results["figure"] = plot_noise_ratios(results["noise_ratios"])
+    return results
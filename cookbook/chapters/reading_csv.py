@@ -0,0 +1,30 @@
+"""Chapter 1: reading bikes.csv and plotting the counters."""
+import datasets
+
+
+def read_bikes():
+    return datasets.load("bikes").sort("Date")
+
+
+def pandas_reference():
+    import pandas as pd
+
+    return pd.read_csv(
+        datasets.path("bikes"), sep=";", encoding="latin1", parse_dates=["Date"], dayfirst=True, index_col="Date"
+    )
+
+
+def plot_bikes(bikes, columns=None):
+    from plotting import plot_frame
+
+    figure, _ = plot_frame(bikes, "Date", columns, figsize=(15, 10))
+    return figure
+
+
+def run(plot=False, reference=False):
+    results = {"bikes": read_bikes()}
+    if reference:
+        results["pandas"] = pandas_reference()
+    if plot:
+        results["figure"] = plot_bikes(results["bikes"])
+    return results
@@ -0,0 +1,44 @@
+"""Chapter 6: which month was the snowiest."""
+import polars as pl
+
+import datasets
+from weather_conditions import condition_flag, encode_weather
+
+
+def monthly_weather(weather):
+    """Median temperature and fraction of snowy hours per month."""
+    weather = encode_weather(weather.lazy())
+    is_snow = condition_flag(weather.collect_schema()["weather"], "Snow")
+    return (
+        weather.sort("date_time")
+        .group_by_dynamic("date_time", every="1mo")
+        .agg(pl.col("temperature_c").median(), is_snow.mean().alias("snowiness"))
+        .collect()
+    )
+
+
+def pandas_reference():
+    import pandas as pd
+
+    weather = pd.read_csv(datasets.path("weather_2012"), parse_dates=True, index_col="date_time")
+    temperature = weather["temperature_c"].resample("M").median()
+    snowiness = weather["weather"].str.contains("Snow").astype(float).resample("M").mean()
+    return pd.DataFrame({"temperature_c": temperature, "snowiness": snowiness})
+
+
+def plot_snowiness(monthly):
+    from plotting import plot_bar
+
+    figure, ax = plot_bar(monthly.with_columns(pl.col("date_time").dt.strftime("%b %Y")), "date_time", "snowiness")
+    ax.set_title("Fraction of snowy hours per month")
+    return figure
+
+
+def run(plot=False, reference=False):
+    weather = datasets.load("weather_2012", columns=["date_time", "temperature_c", "weather"])
+    results = {"monthly_weather": monthly_weather(weather)}
+    if reference:
+        results["pandas"] = pandas_reference()
+    if plot:
+        results["figure"] = plot_snowiness(results["monthly_weather"])
+    return results
@@ -0,0 +1,33 @@
+"""Chapter 8: the most recently installed packages in a popularity-contest report."""
+import polars as pl
+
+import datasets
+from top_k import top_rows
+
+
+def recent_nonlibraries(popcon, n=10):
+    """The `n` non-library packages with the latest ctime, ignoring rows with a zero atime."""
+    nonlibraries = popcon.filter(pl.col("atime") > pl.datetime(1970, 1, 1)).filter(
+        ~pl.col("package-name").str.contains("lib")
+    )
+    return top_rows(nonlibraries, "ctime", n).collect()
+
+
+def pandas_reference(n=10):
+    import pandas as pd
+
+    # The header line has five fields, so pandas uses it as the header (as in the original cookbook).
+    popcon = pd.read_csv(datasets.path("popcon"), sep=" ")[:-1]
+    popcon.columns = ["atime", "ctime", "package-name", "mru-program", "tag"]
+    popcon["atime"] = pd.to_datetime(popcon["atime"].astype(int), unit="s")
+    popcon["ctime"] = pd.to_datetime(popcon["ctime"].astype(int), unit="s")
+    popcon = popcon[popcon["atime"] > "1970-01-01"]
+    nonlibraries = popcon[~popcon["package-name"].str.contains("lib")]
+    return nonlibraries.sort_values("ctime", ascending=False)[:n]
+
+
+def run(plot=False, reference=False):
+    results = {"recent_nonlibraries": recent_nonlibraries(datasets.load("popcon"))}
+    if reference:
+        results["pandas"] = pandas_reference()
+    return results
@@ -0,0 +1,37 @@
+"""Chapter 5: downloading a year of hourly weather, one month at a time.
+
+`run` only touches the network with `download=True`; otherwise it uses
+data/weather_2012.csv, which is what the download produces.
+"""
+import datasets
+from weather import fetch_weather_months, weather_url
+
+
+def download_year(year=2012, cache=None, max_workers=6):
+    return fetch_weather_months([(year, month) for month in range(1, 13)], max_workers=max_workers, cache=cache)
+
+
+def pandas_reference(year=2012, month=3):
+    import pandas as pd
+
+    from weather import clean_data
+
+    data = pd.read_csv(weather_url(year, month), index_col="Date/Time (LST)", parse_dates=True, header=0)
+    return clean_data(data)
+
+
+def plot_temperature(weather):
+    from plotting import plot_frame
+
+    figure, _ = plot_frame(weather, "date_time", ["temperature_c"], figsize=(15, 6))
+    return figure
+
+
+def run(plot=False, reference=False, download=False, cache=None):
+    weather = download_year(cache=cache) if download else datasets.load("weather_2012")
+    results = {"weather": weather}
+    if reference and download:
+        results["pandas"] = pandas_reference()
+    if plot:
+        results["figure"] = plot_temperature(weather)
+    return results
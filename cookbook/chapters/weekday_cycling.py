@@ -0,0 +1,37 @@
+"""Chapter 4: on which weekday people bike the most."""
+import polars as pl
+
+import datasets
+from calendar_features import weekday_name
+
+
+def weekday_counts(bikes, counter="Berri 1"):
+    """Cyclists per weekday, Monday to Sunday."""
+    return bikes.group_by(weekday_name("Date")).agg(pl.col(counter).sum()).sort("weekday_name")
+
+
+def pandas_reference(counter="Berri 1"):
+    import pandas as pd
+
+    bikes = pd.read_csv(
+        datasets.path("bikes"), sep=";", encoding="latin1", parse_dates=["Date"], dayfirst=True, index_col="Date"
+    )
+    return bikes[counter].groupby(bikes.index.weekday).sum()
+
+
+def plot_weekday_counts(counts, counter="Berri 1"):
+    from plotting import plot_bar
+
+    figure, ax = plot_bar(counts, "weekday_name", counter)
+    ax.set_title(f"{counter}: cyclists per weekday")
+    return figure
+
+
+def run(plot=False, reference=False):
+    bikes = datasets.load("bikes", columns=["Date", "Berri 1"])
+    results = {"weekday_counts": weekday_counts(bikes)}
+    if reference:
+        results["pandas"] = pandas_reference()
+    if plot:
+        results["figure"] = plot_weekday_counts(results["weekday_counts"])
+    return results
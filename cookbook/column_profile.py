@@ -0,0 +1,168 @@
+"""A one-pass profile of messy CSV columns, and the read options it suggests (Chapter 7).
+
+Chapter 7 finds out what is wrong with Incident Zip by looking at its
+unique values, then at the ones with a dash, the long ones, the 00000s:
+one scan per question. `profile_columns` answers all of them in one query
+over the raw strings of a `scan_csv`, for every column at once:
+
+* the null-like tokens found (`N/A`, `NO CLUE`, `0`, ...),
+* the most common shapes, with digits as 9, upper- and lowercase letters as
+  A and a (`99999`, `99999-9999`, `A/A`),
+* a histogram of the value lengths,
+* the approximate number of distinct values (HyperLogLog),
+* how many values look like integers (with a leading zero) or decimals.
+
+`suggest_read_options` turns a profile into `null_values` and
+`schema_overrides` for `pl.scan_csv`/`pl.read_csv`:
+
+    profile = profile_columns(path)
+    pl.scan_csv(path, **suggest_read_options(profile))
+
+A token is suggested as null when it doesn't have the column's most common
+shape, or when it is all zeros in a numeric column. Integer columns with
+leading zeros and mostly numeric columns with other forms (zip codes) stay
+strings, columns with few distinct values become categoricals.
+"""
+import re
+from pathlib import Path
+
+import polars as pl
+
+NULL_LIKE_TOKENS = [
+    "N/A", "NA", "NAN", "NULL", "NONE", "NIL", "-", "?", "UNKNOWN", "NO CLUE", "0", "00000",
+]
+
+INTEGER_PATTERN = r"^-?\d+$"
+LEADING_ZERO_PATTERN = r"^0\d"
+DECIMAL_PATTERN = r"^-?\d*\.\d+$"
+
+# Strings with at most this many distinct values, and at most this share of
+# distinct values, are suggested as categoricals.
+MAX_CATEGORIES = 10_000
+MAX_CATEGORY_SHARE = 0.05
+
+PROFILE_SCHEMA = {
+    "column": pl.String,
+    "rows": pl.Int64,
+    "nulls": pl.Int64,
+    "approx_n_unique": pl.Int64,
+    "integers": pl.Int64,
+    "leading_zeros": pl.Int64,
+    "decimals": pl.Int64,
+    "tokens": pl.List(pl.Struct({"token": pl.String, "count": pl.Int64})),
+    "shapes": pl.List(pl.Struct({"shape": pl.String, "count": pl.Int64})),
+    "lengths": pl.List(pl.Struct({"length": pl.Int64, "count": pl.Int64})),
+}
+
+
+def shape(expression):
+    """The character classes of a string expression: digits become 9, letters A or a."""
+    return (
+        expression.str.replace_all(r"[0-9]", "9")
+        .str.replace_all(r"[A-Z]", "A")
+        .str.replace_all(r"[a-z]", "a")
+    )
+
+
+def _shape(value):
+    return re.sub(r"[a-z]", "a", re.sub(r"[A-Z]", "A", re.sub(r"[0-9]", "9", value)))
+
+
+def _aggregations(column, prefix, null_tokens, top):
+    value = pl.col(column).cast(pl.String).str.strip_chars()
+    token = value.str.to_uppercase()
+    return [
+        pl.len().alias(f"{prefix}rows"),
+        value.null_count().alias(f"{prefix}nulls"),
+        value.approx_n_unique().alias(f"{prefix}approx_n_unique"),
+        value.str.contains(INTEGER_PATTERN).sum().alias(f"{prefix}integers"),
+        value.str.contains(LEADING_ZERO_PATTERN).sum().alias(f"{prefix}leading_zeros"),
+        value.str.contains(DECIMAL_PATTERN).sum().alias(f"{prefix}decimals"),
+        token.filter(token.is_in(null_tokens)).alias("token").value_counts(sort=True).implode()
+        .alias(f"{prefix}tokens"),
+        shape(value).drop_nulls().alias("shape").value_counts(sort=True).head(top).implode()
+        .alias(f"{prefix}shapes"),
+        value.str.len_chars().drop_nulls().cast(pl.Int64).alias("length").value_counts().implode()
+        .alias(f"{prefix}lengths"),
+    ]
+
+
+def profile_columns(source, columns=None, null_tokens=NULL_LIKE_TOKENS, top=5):
+    """One row per column of `source` (a CSV path, DataFrame or LazyFrame), see PROFILE_SCHEMA.
+
+    A CSV is read with every column as a string, so the profile sees the
+    text as it is in the file. `tokens` are matched case-insensitively,
+    `shapes` has the `top` most common shapes.
+    """
+    if isinstance(source, (str, Path)):
+        source = pl.scan_csv(source, infer_schema=False)
+    source = source.lazy()
+    columns = columns or source.collect_schema().names()
+    # Every aggregation goes in the same select, so the file is read once.
+    result = source.select([
+        aggregation for i, column in enumerate(columns)
+        for aggregation in _aggregations(column, f"{i}/", null_tokens, top)
+    ]).collect(engine="streaming")
+    rows = []
+    for i, column in enumerate(columns):
+        row = {name: result[f"{i}/{name}"].to_list()[0] for name in list(PROFILE_SCHEMA)[1:]}
+        row["lengths"] = sorted(row["lengths"], key=lambda entry: entry["length"])
+        rows.append({"column": column, **row})
+    return pl.DataFrame(rows, schema=PROFILE_SCHEMA)
+
+
+def suggest_null_tokens(row):
+    """The null-like tokens of one profile row that look like missing values rather than data."""
+    values = row["rows"] - row["nulls"]
+    dominant = row["shapes"][0]["shape"] if row["shapes"] else None
+    numeric = row["integers"] + row["decimals"] > values / 2
+    suggested = []
+    for entry in row["tokens"]:
+        if entry["count"] > values / 2:
+            continue  # most of the column: that's the data
+        zeros = set(entry["token"]) == {"0"}
+        if _shape(entry["token"]) != dominant or (zeros and numeric):
+            suggested.append(entry["token"])
+    return suggested
+
+
+def suggest_dtype(row, null_tokens=()):
+    """The dtype for one profile row once `null_tokens` are nulls, or None to keep strings."""
+    tokens = {entry["token"]: entry["count"] for entry in row["tokens"] if entry["token"] in null_tokens}
+    values = row["rows"] - row["nulls"] - sum(tokens.values())
+    if values <= 0:
+        return None
+
+    def without_tokens(key, pattern):
+        return row[key] - sum(count for token, count in tokens.items() if re.search(pattern, token))
+
+    integers = without_tokens("integers", INTEGER_PATTERN)
+    if integers == values:
+        # Leading zeros would be lost as integers: zip codes, ids.
+        return pl.String if without_tokens("leading_zeros", LEADING_ZERO_PATTERN) else pl.Int64
+    if integers + without_tokens("decimals", DECIMAL_PATTERN) == values:
+        return pl.Float64
+    if integers > values / 2:
+        # Mostly numbers with a few other forms, like ZIP+4 codes: keep strings to clean them up.
+        return pl.String
+    if row["approx_n_unique"] <= min(MAX_CATEGORIES, max(1, MAX_CATEGORY_SHARE * values)):
+        return pl.Categorical
+    return None
+
+
+def suggest_read_options(profile):
+    """`null_values` and `schema_overrides` for `pl.scan_csv` from a `profile_columns` frame.
+
+    `null_values` is one list for all columns, as in Chapter 7, so it is the
+    union of the tokens suggested per column: check that a token like `0`
+    isn't a real value in another column before using it.
+    """
+    null_values = set()
+    schema_overrides = {}
+    for row in profile.iter_rows(named=True):
+        tokens = suggest_null_tokens(row)
+        null_values.update(tokens)
+        dtype = suggest_dtype(row, tokens)
+        if dtype is not None:
+            schema_overrides[row["column"]] = dtype
+    return {"null_values": sorted(null_values), "schema_overrides": schema_overrides}
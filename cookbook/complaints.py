@@ -0,0 +1,137 @@
+"""Loading the NYC 311 service requests used in Chapters 2, 3 and 7.
+
+Reading everything as strings (`infer_schema_length=0`) is safe but wasteful:
+most columns only have a handful of distinct values. The schema below loads
+those as Categorical (Borough as an Enum, its values are fixed), parses the
+dates while reading and keeps the messy columns, like Incident Zip, as
+strings so they can be cleaned up (see Chapter 7).
+"""
+from pathlib import Path
+
+import polars as pl
+
+COMPLAINTS_PATH = Path(__file__).resolve().parent.parent / "data" / "311-service-requests.csv"
+
+DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+DATE_COLUMNS = ["Created Date", "Closed Date", "Due Date", "Resolution Action Updated Date"]
+
+BOROUGH = pl.Enum(["BRONX", "BROOKLYN", "MANHATTAN", "QUEENS", "STATEN ISLAND", "Unspecified"])
+
+CATEGORICAL_COLUMNS = [
+    "Agency",
+    "Agency Name",
+    "Complaint Type",
+    "Descriptor",
+    "Location Type",
+    "Address Type",
+    "City",
+    "Facility Type",
+    "Status",
+    "Community Board",
+    "Park Facility Name",
+    "Park Borough",
+    "School Region",
+    "School State",
+    "School Not Found",
+    "School or Citywide Complaint",
+    "Vehicle Type",
+    "Taxi Company Borough",
+    "Bridge Highway Name",
+    "Bridge Highway Direction",
+    "Road Ramp",
+    "Ferry Direction",
+]
+
+SCHEMA_OVERRIDES = {
+    "Unique Key": pl.Int64,
+    "X Coordinate (State Plane)": pl.Int64,
+    "Y Coordinate (State Plane)": pl.Int64,
+    "Latitude": pl.Float64,
+    "Longitude": pl.Float64,
+    **{column: pl.Categorical for column in CATEGORICAL_COLUMNS},
+}
+
+
+def scan_complaints(path=COMPLAINTS_PATH, typed=True, **kwargs):
+    """Lazily scan a 311 export.
+
+    With `typed=False` every column is a string, which is what Chapter 2 used
+    to do. Columns that are not in the file are ignored, so this works on
+    exports with fewer columns too.
+    """
+    if not typed:
+        return pl.scan_csv(path, infer_schema=False, **kwargs)
+    columns = pl.scan_csv(path, infer_schema=False, n_rows=0).collect_schema().names()
+    overrides = {column: dtype for column, dtype in SCHEMA_OVERRIDES.items() if column in columns}
+    return pl.scan_csv(path, infer_schema=False, schema_overrides=overrides, **kwargs).with_columns(
+        [pl.col(column).str.strptime(pl.Datetime, DATE_FORMAT, strict=False)
+         for column in DATE_COLUMNS if column in columns]
+        + ([pl.col("Borough").cast(BOROUGH)] if "Borough" in columns else [])
+    )
+
+
+def read_complaints(path=COMPLAINTS_PATH, typed=True, **kwargs):
+    return scan_complaints(path, typed, **kwargs).collect()
+
+
+def noise_ratio_by_borough(complaints, complaint_type="Noise - Street/Sidewalk"):
+    """Share of `complaint_type` among all complaints per borough, as one lazy query.
+
+    Totals and noise complaints are counted in the same group-by (the noise
+    count is a conditional sum), so the data is scanned once and no join is
+    needed. Collect with `engine="streaming"` for files larger than memory.
+    """
+    return (
+        complaints.lazy()
+        .group_by("Borough")
+        .agg(
+            (pl.col("Complaint Type") == complaint_type).sum().alias("count"),
+            pl.len().alias("count_total"),
+        )
+        .with_columns((pl.col("count") / pl.col("count_total")).alias("ratio"))
+        .sort("Borough")
+    )
+
+
+ZIP_NULL_TOKENS = ["NO CLUE", "N/A", "0", "00000"]
+
+
+def normalize_zip(column="Incident Zip", null_tokens=ZIP_NULL_TOKENS):
+    """Expression that cleans up a zip code column in one go (see Chapter 7).
+
+    Null tokens become null, ZIP+4 codes like `29616-0759` are truncated to
+    five digits and `00000` becomes null.
+    """
+    zip_code = pl.col(column).str.strip_chars()
+    return (
+        pl.when(zip_code.is_in(null_tokens))
+        .then(None)
+        .otherwise(zip_code.str.slice(0, 5))
+        .replace("00000", None)
+        .alias(column)
+    )
+
+
+def zip_region(column="Incident Zip"):
+    """'near' for zip codes starting with 0 or 1 (the New York area), 'far' otherwise."""
+    first_digit = pl.col(column).str.slice(0, 1)
+    return (
+        pl.when(first_digit.is_in(["0", "1"]))
+        .then(pl.lit("near"))
+        .when(pl.col(column).is_not_null())
+        .then(pl.lit("far"))
+        .cast(pl.Enum(["near", "far"]))
+        .alias("zip_region")
+    )
+
+
+def clean_zip_codes(complaints, column="Incident Zip", null_tokens=ZIP_NULL_TOKENS):
+    """Add the normalized zip code and its region to a (lazy) 311 frame.
+
+    The region is computed from the normalized zip code, so it is a second
+    `with_columns`. Both are evaluated row batch by row batch in the same
+    query, so on a `scan_complaints` frame collected with
+    `engine="streaming"` (or written with `sink_parquet`) the file is read
+    once in bounded memory.
+    """
+    return complaints.lazy().with_columns(normalize_zip(column, null_tokens)).with_columns(zip_region(column))
@@ -0,0 +1,221 @@
+"""A Parquet layout of the 311 requests that lets Borough, Complaint Type and zip filters skip data.
+
+Chapter 3 filters on Complaint Type and Borough and Chapter 7 on Incident
+Zip prefixes, and on the CSV every filter reads every row. `write_store`
+writes one file per borough:
+
+    data/complaints_store/Borough=BROOKLYN/data.parquet
+
+sorted by Complaint Type and Incident Zip, in row groups of ROW_GROUP_SIZE
+rows with min/max statistics. A complaint type then covers a few
+consecutive row groups, and within it the zips are sorted too.
+
+`plan` works out which files and row groups a filter needs from the
+partition directories and the row-group statistics alone, `read_plan`
+reads only those and applies the filter exactly:
+
+    query(equals={"Borough": "BROOKLYN", "Complaint Type": "Noise - Street/Sidewalk"})
+    query(prefixes={"Incident Zip": "112"}, columns=["Complaint Type", "Incident Zip"])
+
+`store()` builds the store from the 311 dataset the first time and again
+only when the source's fingerprint changes (see datasets.py).
+
+`scan_store` scans the store with Polars instead, which prunes partitions
+and row groups the same way. Bloom filters on Incident Zip can be written
+with `bloom_filter_columns` for readers that use them (DuckDB, Spark);
+neither Polars nor the planner reads them.
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+import polars as pl
+import pyarrow.parquet as pq
+
+import datasets
+from complaints import scan_complaints
+
+DEFAULT_STORE_DIR = datasets.DATA_DIR / "complaints_store"
+PARTITION_COLUMN = "Borough"
+SORT_COLUMNS = ["Complaint Type", "Incident Zip"]
+
+# Bump when the layout changes, so existing stores are rebuilt.
+STORE_VERSION = 1
+
+# Small enough that a complaint type of a few thousand rows in a borough
+# is one or two row groups, large enough to keep the metadata small.
+ROW_GROUP_SIZE = 50_000
+
+
+def partition_path(root, borough):
+    # Quoted, so "STATEN ISLAND" is a valid hive directory.
+    return Path(root) / f"{PARTITION_COLUMN}={quote(borough, safe='')}" / "data.parquet"
+
+
+def write_partition(part, path, row_group_size=ROW_GROUP_SIZE, bloom_filter_columns=(), compression="zstd"):
+    """Write one borough, sorted by SORT_COLUMNS, in row groups with statistics."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Categoricals become plain strings, so the statistics compare the values themselves.
+    table = part.sort(SORT_COLUMNS, nulls_last=True).with_columns(
+        pl.col(pl.Categorical, pl.Enum).cast(pl.String)
+    ).to_arrow()
+    options = {}
+    if bloom_filter_columns:
+        options["bloom_filter_options"] = {
+            column: {"ndv": max(1, part[column].n_unique()), "fpp": 0.01} for column in bloom_filter_columns
+        }
+    try:
+        pq.write_table(
+            table, path, row_group_size=row_group_size, write_statistics=True, compression=compression, **options
+        )
+    except TypeError as error:
+        if not options:
+            raise
+        raise RuntimeError("this pyarrow version can't write Parquet bloom filters") from error
+    return path
+
+
+def write_store(source=None, root=DEFAULT_STORE_DIR, row_group_size=ROW_GROUP_SIZE, bloom_filter_columns=(),
+                fingerprint=None):
+    """Write a 311 export (a path, or a frame like `scan_complaints` returns) as one file per borough.
+
+    Whatever was in `root` before is replaced, so no stale borough is left
+    behind. Returns the paths written. Requests without a borough go to
+    `Borough=Unspecified`. `fingerprint` is saved with the store, see `store`.
+    """
+    if source is None or isinstance(source, (str, Path)):
+        source = scan_complaints(source or datasets.path("complaints"))
+    frame = source.lazy().with_columns(
+        pl.col(PARTITION_COLUMN).cast(pl.String).fill_null("Unspecified")
+    ).collect(engine="streaming")
+
+    # Written next to the store and swapped in at the end, so a failed write leaves the old store.
+    root = Path(root)
+    tmp_root = root.with_name(f"{root.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    for (borough,), part in frame.partition_by(PARTITION_COLUMN, as_dict=True).items():
+        write_partition(part.drop(PARTITION_COLUMN), partition_path(tmp_root, borough), row_group_size,
+                        bloom_filter_columns)
+    meta = {"version": STORE_VERSION, "fingerprint": fingerprint}
+    (tmp_root / "meta.json").write_text(json.dumps(meta, indent=1))
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp_root, root)
+    return sorted(root.glob("*/data.parquet"))
+
+
+def _saved_fingerprint(root):
+    try:
+        meta = json.loads((Path(root) / "meta.json").read_text())
+    except FileNotFoundError:
+        return None
+    return meta["fingerprint"] if meta.get("version") == STORE_VERSION else None
+
+
+def store(root=DEFAULT_STORE_DIR, refresh=False):
+    """The store of the 311 dataset in `root`, (re)built only when it is missing or out of date."""
+    fingerprint = datasets.fingerprint("complaints")
+    if refresh or _saved_fingerprint(root) != fingerprint:
+        write_store(datasets.path("complaints"), root, fingerprint=fingerprint)
+    return Path(root)
+
+
+def scan_store(root=DEFAULT_STORE_DIR):
+    """Lazily scan the store, with Borough from the partition directories."""
+    return pl.scan_parquet(
+        Path(root) / "**" / "*.parquet", hive_partitioning=True, hive_schema={PARTITION_COLUMN: pl.String}
+    )
+
+
+@dataclass
+class FilePlan:
+    path: Path
+    borough: str
+    row_groups: list
+    total_row_groups: int
+    rows: int
+
+
+def _may_match(statistics, value=None, prefix=None):
+    """Whether a row group with these statistics can have `value`, or a value starting with `prefix`."""
+    if statistics is None or not statistics.has_min_max:
+        return True
+    if value is not None:
+        return statistics.min <= value <= statistics.max
+    return statistics.max >= prefix and statistics.min[:len(prefix)] <= prefix
+
+
+def plan(root=DEFAULT_STORE_DIR, equals=None, prefixes=None):
+    """The files and row groups that can match `equals` ({column: value}) and `prefixes` ({column: prefix}).
+
+    Borough picks the partitions; the other columns are checked against
+    the min/max statistics of every row group. Nothing is read but the
+    Parquet footers.
+    """
+    equals, prefixes = dict(equals or {}), dict(prefixes or {})
+    borough = equals.pop(PARTITION_COLUMN, None)
+    paths = [partition_path(root, borough)] if borough is not None else sorted(Path(root).glob("*/data.parquet"))
+    plans = []
+    for path in paths:
+        if not path.exists():
+            continue
+        metadata = pq.ParquetFile(path).metadata
+        index = {metadata.schema.column(i).name: i for i in range(metadata.num_columns)}
+        row_groups = []
+        rows = 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            if all(
+                _may_match(row_group.column(index[column]).statistics, value=value)
+                for column, value in equals.items()
+            ) and all(
+                _may_match(row_group.column(index[column]).statistics, prefix=prefix)
+                for column, prefix in prefixes.items()
+            ):
+                row_groups.append(i)
+                rows += row_group.num_rows
+        if row_groups:
+            plans.append(FilePlan(
+                path, unquote(path.parent.name.split("=", 1)[1]), row_groups, metadata.num_row_groups, rows
+            ))
+    return plans
+
+
+def store_schema(root=DEFAULT_STORE_DIR):
+    """An empty frame with the columns of the store, Borough last."""
+    paths = sorted(Path(root).glob("*/data.parquet"))
+    if not paths:
+        return pl.DataFrame()
+    empty = pl.from_arrow(pq.read_schema(paths[0]).empty_table())
+    return empty.with_columns(pl.lit(None, pl.String).alias(PARTITION_COLUMN))
+
+
+def read_plan(plans, columns=None, root=DEFAULT_STORE_DIR):
+    """Read the planned row groups (only `columns`, if given) into one frame, with Borough.
+
+    Without any planned row groups, the frame is empty but has the columns
+    of the store in `root`.
+    """
+    frames = []
+    for file_plan in plans:
+        file_columns = None if columns is None else [column for column in columns if column != PARTITION_COLUMN]
+        table = pq.ParquetFile(file_plan.path).read_row_groups(file_plan.row_groups, columns=file_columns)
+        frames.append(pl.from_arrow(table).with_columns(pl.lit(file_plan.borough).alias(PARTITION_COLUMN)))
+    frame = pl.concat(frames, how="vertical_relaxed") if frames else store_schema(root)
+    return frame.select(columns) if columns is not None and frame.width else frame
+
+
+def query(root=DEFAULT_STORE_DIR, equals=None, prefixes=None, columns=None):
+    """The rows matching `equals` and `prefixes` (see `plan`), reading only the row groups that can match."""
+    equals, prefixes = dict(equals or {}), dict(prefixes or {})
+    needed = None if columns is None else list(dict.fromkeys([*columns, *equals, *prefixes]))
+    frame = read_plan(plan(root, equals, prefixes), needed, root)
+    if not frame.width:
+        return frame  # no store
+    conditions = [pl.col(column) == value for column, value in equals.items()]
+    conditions += [pl.col(column).str.starts_with(prefix) for column, prefix in prefixes.items()]
+    if conditions:
+        frame = frame.filter(conditions)
+    return frame.select(columns) if columns is not None else frame
@@ -0,0 +1,168 @@
+"""The cookbook datasets, parsed once and cached as Arrow IPC files.
+
+    from datasets import load, path
+
+    bikes = load("bikes")          # parsed Date column, counters as integers
+    weather = load("weather_2012")
+    pd.read_csv(path("bikes"), sep=";", encoding="latin1")
+
+The first `load` parses the source with its declared schema and writes the
+result to data/cache/ipc/<name>.arrow, uncompressed and in one chunk. Later
+loads memory-map that file, so the columns are not copied (or parsed)
+again: re-running a cell is close to free. The cache is rebuilt when the
+source changes: a different size or modification time triggers a hash of
+the source, and only a different hash re-parses it (a `touch` doesn't).
+
+Paths are relative to this file, so the chapters work from any working
+directory.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import polars as pl
+
+from complaints import read_complaints
+from popcon import read_popcon
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_CACHE_DIR = DATA_DIR / "cache" / "ipc"
+
+# Bump when a parser changes, so existing caches are rebuilt.
+CACHE_VERSION = 2
+
+# weather.CLEAN_SCHEMA, with date_time parsed after reading.
+WEATHER_SCHEMA = {
+    "date_time": pl.String,
+    "longitude": pl.Float64,
+    "latitude": pl.Float64,
+    "station_name": pl.String,
+    "climate_id": pl.String,
+    "temperature_c": pl.Float64,
+    "dew_point_temp_c": pl.Float64,
+    "relative_humidity": pl.Int64,
+    "wind_speed_kmh": pl.Int64,
+    "visibility_km": pl.Float64,
+    "station_pressure_kpa": pl.Float64,
+    "weather": pl.String,
+}
+
+
+def read_bikes(path):
+    # The scan_* readers only handle UTF-8, bikes.csv is latin1.
+    return pl.read_csv(path, separator=";", encoding="latin1").with_columns(
+        pl.col("Date").str.to_date("%d/%m/%Y")
+    ).set_sorted("Date")
+
+
+def read_weather_2012(path):
+    return (
+        pl.scan_csv(path, schema=WEATHER_SCHEMA)
+        .with_columns(pl.col("date_time").str.to_datetime("%Y-%m-%d %H:%M:%S"))
+        .collect()
+        .set_sorted("date_time")
+    )
+
+
+@dataclass(frozen=True)
+class Dataset:
+    source: str  # file name in DATA_DIR
+    parse: Callable[[Path], pl.DataFrame]
+
+
+DATASETS = {
+    "bikes": Dataset("bikes.csv", read_bikes),
+    "weather_2012": Dataset("weather_2012.csv", read_weather_2012),
+    "complaints": Dataset("311-service-requests.csv", read_complaints),
+    "popcon": Dataset("popularity-contest", read_popcon),
+}
+
+
+def _dataset(name):
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ValueError(f"unknown dataset {name!r}, use one of {sorted(DATASETS)}") from None
+
+
+def path(name):
+    """The source file of a dataset, for readers that want to parse it themselves."""
+    return DATA_DIR / _dataset(name).source
+
+
+def _source_meta(source):
+    """Size, mtime and SHA-256 of `source`, all taken from the same open file."""
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        stat = os.fstat(f.fileno())
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+def _is_fresh(meta, source, meta_path):
+    if meta.get("version") != CACHE_VERSION:
+        return False
+    stat = source.stat()
+    if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if meta["size"] != stat.st_size:
+        return False
+    current = _source_meta(source)
+    if meta["sha256"] != current["sha256"]:
+        return False
+    # Same contents, new mtime: remember it so the next load skips the hash.
+    meta["mtime_ns"] = current["mtime_ns"]
+    meta_path.write_text(json.dumps(meta, indent=1))
+    return True
+
+
+def _write(frame, source_meta, source, ipc_path, meta_path):
+    ipc_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = ipc_path.with_suffix(f".{os.getpid()}.tmp")
+    # Memory mapping is only zero-copy for uncompressed files.
+    frame.rechunk().write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, ipc_path)
+    meta = {"version": CACHE_VERSION, "source": str(source), **source_meta}
+    meta_path.write_text(json.dumps(meta, indent=1))
+
+
+def is_cached(name, cache_dir=DEFAULT_CACHE_DIR):
+    """Whether `load(name)` would come from an up to date cache."""
+    cache_dir = Path(cache_dir)
+    meta_path = cache_dir / f"{name}.json"
+    if not (cache_dir / f"{name}.arrow").exists() or not meta_path.exists():
+        return False
+    return _is_fresh(json.loads(meta_path.read_text()), path(name), meta_path)
+
+
+def load(name, columns=None, cache_dir=DEFAULT_CACHE_DIR, refresh=False):
+    """The parsed dataset `name` (see DATASETS), from the IPC cache when it is up to date.
+
+    `columns` only reads those columns from the cache. `refresh=True`
+    parses the source again even if the cache looks fresh.
+    """
+    source = path(name)
+    cache_dir = Path(cache_dir)
+    ipc_path = cache_dir / f"{name}.arrow"
+    if refresh or not is_cached(name, cache_dir):
+        # Taken before parsing: if the source changes meanwhile, the next load sees it.
+        source_meta = _source_meta(source)
+        _write(_dataset(name).parse(source), source_meta, source, ipc_path, cache_dir / f"{name}.json")
+    # Polars memory-maps uncompressed IPC files by default, and the file is
+    # written in one chunk, so nothing is copied or rechunked. (Polars 2 has
+    # neither the memory_map nor the rechunk argument any more.)
+    return pl.read_ipc(ipc_path, columns=columns)
+
+
+def fingerprint(name, cache_dir=DEFAULT_CACHE_DIR):
+    """The SHA-256 of a dataset's source, to tell whether things derived from it are stale.
+
+    It comes from the cache metadata, so the source is only hashed again when it changed.
+    """
+    if not is_cached(name, cache_dir):
+        load(name, cache_dir=cache_dir)
+    return json.loads((Path(cache_dir) / f"{name}.json").read_text())["sha256"]
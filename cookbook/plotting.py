@@ -0,0 +1,138 @@
+"""Plotting Polars frames with matplotlib.
+
+matplotlib wants NumPy arrays. `.to_list()` builds a Python object for every
+value, while `to_numpy` can usually hand over a view of the Polars memory
+without copying. Long series are downsampled in Polars first: a screen can't
+show more than a few thousand points anyway, and drawing millions of them
+is slow.
+
+matplotlib is only imported when something is drawn. Without a display
+(batch jobs, the chapter modules in chapters/) it uses the non-interactive
+Agg backend.
+"""
+import os
+import sys
+
+import numpy as np
+import polars as pl
+
+MAX_POINTS = 4000
+
+
+def pyplot():
+    """`matplotlib.pyplot`, imported on first use."""
+    if "matplotlib.pyplot" not in sys.modules and not os.environ.get("MPLBACKEND"):
+        headless = sys.platform.startswith("linux") and not (
+            os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")
+        )
+        if headless:
+            import matplotlib
+
+            matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def to_numpy(series):
+    """A zero-copy NumPy view of `series` when possible, a copy otherwise
+    (e.g. when it contains nulls or strings)."""
+    try:
+        return series.to_numpy(allow_copy=False)
+    except RuntimeError:
+        return series.to_numpy()
+
+
+def minmax_indices(frame, column, n_buckets):
+    """Row numbers of the minimum and maximum of `column` in each of `n_buckets`
+    equal-sized buckets, so spikes survive the downsampling."""
+    return (
+        frame.lazy()
+        .select(pl.col(column))
+        .with_row_index("_row")
+        .group_by((pl.col("_row") * n_buckets // pl.len()).alias("_bucket"))
+        .agg(
+            pl.col("_row").get(pl.col(column).arg_min()).alias("_min"),
+            pl.col("_row").get(pl.col(column).arg_max()).alias("_max"),
+        )
+        .select(pl.concat_list("_min", "_max").explode().drop_nulls().unique().sort())
+        .collect()
+        .to_series()
+    )
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: the row numbers of `n_out` points that
+    keep the visual shape of the line through (x, y)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # The average of the next bucket is the third corner of the triangle.
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(frame, x, column, max_points=MAX_POINTS, method="minmax"):
+    """(x, y) NumPy arrays for `column` with at most about `max_points` points."""
+    if frame.height <= max_points:
+        return to_numpy(frame[x]), to_numpy(frame[column])
+    if method == "minmax":
+        rows = minmax_indices(frame, column, max_points // 2)
+    elif method == "lttb":
+        rows = lttb_indices(to_numpy(frame[x].to_physical()), to_numpy(frame[column]), max_points)
+    else:
+        raise ValueError(f"unknown downsampling method {method!r}, use 'minmax' or 'lttb'")
+    points = frame.select(x, column)[rows]
+    return to_numpy(points[x]), to_numpy(points[column])
+
+
+def _figure_and_axes(ax=None, figsize=None):
+    # A new figure unless `ax` is given: the current axes may belong to an
+    # earlier plot, e.g. date axes that can't take the weekday names of a bar chart.
+    if ax is None:
+        return pyplot().subplots(figsize=figsize)
+    return ax.figure, ax
+
+
+def plot_frame(frame, x, columns=None, ax=None, max_points=MAX_POINTS, method="minmax", legend=True, figsize=None,
+               **kwargs):
+    """Plot every column (or `columns`) of `frame` against `x` in one call, returns `(figure, ax)`.
+
+    This is what `df.plot()` does in pandas, e.g. `plot_frame(pl_fixed_df, "Date")`.
+    Without `ax` it draws on a new figure of `figsize`.
+    """
+    figure, ax = _figure_and_axes(ax, figsize)
+    columns = columns or [column for column in frame.columns if column != x]
+    for column in columns:
+        if frame[column].null_count() == frame.height:
+            continue
+        x_values, y_values = downsample(frame, x, column, max_points, method)
+        ax.plot(x_values, y_values, label=column, **kwargs)
+    if legend and len(columns) > 1:
+        ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize=10)
+    return figure, ax
+
+
+def plot_bar(frame, x, y, ax=None, figsize=None, **kwargs):
+    """A bar chart of `y` per `x`, like pandas' `.plot(kind="bar")`, returns `(figure, ax)`.
+
+    Without `ax` it draws on a new figure of `figsize`.
+    """
+    figure, ax = _figure_and_axes(ax, figsize)
+    ax.bar(to_numpy(frame[x].cast(pl.String)), to_numpy(frame[y]), **kwargs)
+    return figure, ax
@@ -0,0 +1,61 @@
+"""Reading popularity-contest reports (Chapter 8).
+
+A report looks like this:
+
+    POPULARITY-CONTEST-0 TIME:1387295813 ID:d9bd... ARCH:amd64 POPCONVER:1.53ubuntu1
+    1387295797 1367633260 perl-base /usr/bin/perl
+    0 0 libusbmuxd1 <NOFILES>
+    1387295796 1354370480 login /bin/su <RECENT-CTIME>
+    END-POPULARITY-CONTEST-0 TIME:1387295813
+
+The lines are read by the Polars CSV reader and split on spaces: the header
+line is skipped, the footer is treated as a comment and the optional tag
+column is null where it is missing. atime and ctime are read as integers
+and turned into datetimes in the same scan, so no Python objects are created
+per row.
+"""
+from pathlib import Path
+
+import polars as pl
+
+POPCON_PATH = Path(__file__).resolve().parent.parent / "data" / "popularity-contest"
+
+POPCON_SCHEMA = {
+    "atime": pl.Int64,
+    "ctime": pl.Int64,
+    "package-name": pl.String,
+    "mru-program": pl.String,
+    "tag": pl.String,
+}
+
+
+def read_popcon_header(path=POPCON_PATH):
+    """The `KEY:value` fields of the header line, e.g. {'TIME': '1387295813', 'ARCH': 'amd64', ...}."""
+    with open(path, encoding="utf-8") as f:
+        header = f.readline().split()
+    return dict(field.split(":", 1) for field in header[1:])
+
+
+def scan_popcon(path=POPCON_PATH):
+    # Rows have four or five fields, which the CSV reader rejects under a fixed
+    # schema, so every line is read as one field and split into at most five.
+    fields = pl.col("line").str.splitn(" ", len(POPCON_SCHEMA))
+    return pl.scan_csv(
+        path,
+        separator="\x1f",
+        has_header=False,
+        skip_rows=1,
+        comment_prefix="END-P",
+        quote_char=None,
+        schema={"line": pl.String},
+    ).select([
+        fields.struct.field(f"field_{i}").cast(dtype).alias(name)
+        for i, (name, dtype) in enumerate(POPCON_SCHEMA.items())
+    ]).with_columns(
+        pl.from_epoch("atime", time_unit="s").cast(pl.Datetime("ms")),
+        pl.from_epoch("ctime", time_unit="s").cast(pl.Datetime("ms")),
+    )
+
+
+def read_popcon(path=POPCON_PATH):
+    return scan_popcon(path).collect()
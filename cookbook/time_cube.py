@@ -0,0 +1,199 @@
+"""Pre-aggregated (year, month, weekday, hour) cubes of the weather and bike data.
+
+Chapters 4, 5 and 6 all group raw rows by a time feature: cyclists per
+weekday, the median temperature per hour of the day, the median temperature
+and snowiness per month. A cube aggregates the rows once per
+(year, month, weekday, hour) cell, which is at most 2016 cells per year, and
+answers all of those questions by rolling the cells up:
+
+    weather = cube("weather_2012")
+    weather.query(["month"])              # temperature_c_median, snow_mean, ...
+    weather.query(["hour"], ["temperature_c"])
+    cube("bikes").query(["weekday"], ["Berri 1"])
+
+Every cell stores, per measure, the sum and the number of non-null values
+(so sums and means roll up exactly) and, for the measures with a sketch, a
+histogram at a fixed resolution (so medians roll up too, exact to half the
+resolution; weather temperatures are recorded to 0.1 °C). Cubes are saved
+in data/cache/cubes/<dataset> with the fingerprint of their source and are
+only rebuilt when it changes.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import polars as pl
+
+import datasets
+from weather_aggregates import histogram_medians
+
+DIMENSIONS = ["year", "month", "weekday", "hour"]
+DEFAULT_CUBE_DIR = datasets.DATA_DIR / "cache" / "cubes"
+
+# Bump when the cube layout changes, so saved cubes are rebuilt.
+CUBE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CubeSpec:
+    time_column: str
+    # name -> expression of the values to sum (booleans count the true values)
+    measures: dict
+    # name -> histogram resolution, for measures whose median we want
+    sketches: dict = field(default_factory=dict)
+
+
+BIKE_COUNTERS = [
+    "Berri 1", "Côte-Sainte-Catherine", "Maisonneuve 1", "Maisonneuve 2", "du Parc", "Pierre-Dupuy", "Rachel1",
+]
+
+SPECS = {
+    "weather_2012": CubeSpec(
+        "date_time",
+        {
+            "temperature_c": pl.col("temperature_c"),
+            "snow": pl.col("weather").str.contains("Snow", literal=True),
+        },
+        {"temperature_c": 0.1},
+    ),
+    "bikes": CubeSpec("Date", {counter: pl.col(counter) for counter in BIKE_COUNTERS}),
+}
+
+
+def _dimensions(time_column):
+    # Dates have no hour; casting them to datetimes puts them at midnight.
+    time = pl.col(time_column).cast(pl.Datetime("us"))
+    return [
+        time.dt.year().alias("year"),
+        time.dt.month().alias("month"),
+        time.dt.weekday().alias("weekday"),
+        time.dt.hour().alias("hour"),
+    ]
+
+
+def build_cells(frame, spec):
+    """rows, <measure>_sum and <measure>_count per (year, month, weekday, hour)."""
+    values = frame.lazy().select([*_dimensions(spec.time_column), *(
+        expression.cast(pl.Float64).alias(name) for name, expression in spec.measures.items()
+    )])
+    aggregations = [pl.len().alias("rows")]
+    for name in spec.measures:
+        aggregations += [pl.col(name).sum().alias(f"{name}_sum"), pl.col(name).count().alias(f"{name}_count")]
+    cells = values.group_by(DIMENSIONS).agg(aggregations).sort(DIMENSIONS)
+
+    histograms = [
+        values.select(
+            *DIMENSIONS,
+            pl.lit(name).alias("measure"),
+            (pl.col(name) / resolution).round().cast(pl.Int32).alias("bin"),
+        )
+        .drop_nulls("bin")
+        .group_by([*DIMENSIONS, "measure", "bin"])
+        .agg(pl.len().alias("count"))
+        for name, resolution in spec.sketches.items()
+    ]
+    cells, *histograms = pl.collect_all([cells, *histograms])
+    if histograms:
+        histogram = pl.concat(histograms)
+    else:
+        histogram = pl.DataFrame(schema={
+            **cells.select(DIMENSIONS).schema, "measure": pl.String, "bin": pl.Int32, "count": pl.UInt32,
+        })
+    return cells, histogram
+
+
+class Cube:
+    def __init__(self, spec, cells, histogram, fingerprint=None):
+        self.spec = spec
+        self.cells = cells
+        self.histogram = histogram
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, frame, spec, fingerprint=None):
+        return cls(spec, *build_cells(frame, spec), fingerprint)
+
+    def query(self, by, measures=None):
+        """Roll the cube up to the dimensions in `by` (a subset of DIMENSIONS, [] for the total).
+
+        Returns `rows` and, per measure, `<measure>_sum` and `<measure>_mean`,
+        plus `<measure>_median` for the measures with a sketch.
+        """
+        by = list(by)
+        unknown = set(by) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"unknown dimensions {sorted(unknown)}, use some of {DIMENSIONS}")
+        measures = list(self.spec.measures if measures is None else measures)
+        # An empty group-by isn't possible, so the grand total groups by a constant.
+        keys = by or [pl.lit(0).alias("_total")]
+        result = (
+            self.cells.lazy()
+            .group_by(keys)
+            .agg(pl.col("rows").sum(), *(
+                pl.col(f"{name}_{column}").sum() for name in measures for column in ("sum", "count")
+            ))
+            .select(
+                *(by or ["_total"]),
+                "rows",
+                *(pl.col(f"{name}_sum") for name in measures),
+                *((pl.col(f"{name}_sum") / pl.col(f"{name}_count")).alias(f"{name}_mean") for name in measures),
+            )
+        )
+        for name in measures:
+            if name not in self.spec.sketches:
+                continue
+            histogram = (
+                self.histogram.lazy()
+                .filter(pl.col("measure") == name)
+                .group_by([*keys, "bin"])
+                .agg(pl.col("count").sum())
+            )
+            medians = histogram_medians(
+                histogram, self.spec.sketches[name], keys=by or ["_total"], alias=f"{name}_median"
+            )
+            result = result.join(medians, on=by or ["_total"], how="left")
+        result = result.sort(by) if by else result.drop("_total")
+        return result.collect()
+
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.cells.write_parquet(directory / "cells.parquet")
+        self.histogram.write_parquet(directory / "histogram.parquet")
+        meta = {"version": CUBE_VERSION, "fingerprint": self.fingerprint}
+        tmp_path = directory / f"meta.{os.getpid()}.tmp"
+        tmp_path.write_text(json.dumps(meta, indent=1))
+        # Written last, so a half-written cube is never taken for an up to date one.
+        os.replace(tmp_path, directory / "meta.json")
+
+    @classmethod
+    def load(cls, directory, spec):
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text())
+        return cls(
+            spec,
+            pl.read_parquet(directory / "cells.parquet"),
+            pl.read_parquet(directory / "histogram.parquet"),
+            meta["fingerprint"],
+        )
+
+
+def _saved_fingerprint(directory):
+    try:
+        meta = json.loads((directory / "meta.json").read_text())
+    except FileNotFoundError:
+        return None
+    return meta["fingerprint"] if meta.get("version") == CUBE_VERSION else None
+
+
+def cube(name, cube_dir=DEFAULT_CUBE_DIR, refresh=False):
+    """The cube of dataset `name` (see SPECS), rebuilt only when the dataset's source changed."""
+    spec = SPECS[name]
+    directory = Path(cube_dir) / name
+    fingerprint = datasets.fingerprint(name)
+    if not refresh and _saved_fingerprint(directory) == fingerprint:
+        return Cube.load(directory, spec)
+    result = Cube.build(datasets.load(name), spec, fingerprint)
+    result.save(directory)
+    return result
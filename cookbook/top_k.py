@@ -0,0 +1,231 @@
+"""The k most common values of a column, or the k largest rows, without a full sort.
+
+Chapter 2 counts every complaint type and sorts all the counts to keep ten,
+Chapter 8 sorts every package by ctime for the same reason. `top_values` and
+`top_rows` build lazy queries with `top_k`, a partial selection that only
+keeps k rows, so they also run on a `scan_csv` with `engine="streaming"`:
+
+    top_values(scan_complaints(path), "Complaint Type").collect(engine="streaming")
+    top_rows(popcon, "ctime").collect()
+
+Counting exactly still needs one counter per distinct value. For columns
+with millions of distinct values `approx_top_values` reads the column in
+batches into a sketch of bounded size instead:
+
+* `SpaceSaving` keeps `capacity` counters. Counts are overestimates by at
+  most `error`, and a value without a counter occurred at most `floor` times.
+* `CountMin` keeps a `depth` x `width` table of counts plus `capacity`
+  candidates. Counts are overestimates by at most `epsilon * n` with
+  probability `1 - delta`.
+
+Values are counted as strings. Both report, per value, the count, its
+maximum error and whether the value is guaranteed to be in the true top k.
+Sketches of the same size can be merged, e.g. one per file of a dump.
+"""
+import math
+from pathlib import Path
+
+import polars as pl
+
+
+def top_values(frame, column, k=10):
+    """The `k` most common non-null values of `column` with their `count`, most common first, as a lazy query."""
+    return (
+        frame.lazy()
+        .filter(pl.col(column).is_not_null())
+        .group_by(column)
+        .agg(pl.len().alias("count"))
+        .top_k(k, by="count")
+        .sort("count", column, descending=[True, False])
+    )
+
+
+def top_rows(frame, by, k=10, descending=True):
+    """The `k` rows with the largest (smallest with `descending=False`) `by`, in that order, as a lazy query."""
+    frame = frame.lazy()
+    selected = frame.top_k(k, by=by) if descending else frame.bottom_k(k, by=by)
+    return selected.sort(by, descending=descending)
+
+
+def _value_counts(values):
+    # Strings hash and join the same in every batch, whatever the column's dtype
+    # (the categories of different batches don't share their physical codes).
+    values = values.drop_nulls().cast(pl.String).rename("value")
+    return values.value_counts(name="count").with_columns(pl.col("count").cast(pl.Int64))
+
+
+def _guaranteed(counts, errors, k, bound):
+    """Whether each of the top k counts is certainly larger than every count after them."""
+    rest = counts[k:]
+    threshold = max(bound, rest.max() if len(rest) else 0)
+    return ((counts[:k] - errors) >= threshold).alias("guaranteed")
+
+
+class SpaceSaving:
+    """Space-Saving counters for the heavy hitters of a stream of values."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counters = pl.DataFrame(schema={"value": pl.String, "count": pl.Int64, "error": pl.Int64})
+        # Upper bound on the count of every value without a counter.
+        self.floor = 0
+        self.n = 0
+
+    def update(self, values):
+        """Count the non-null `values` (a Series) of one batch."""
+        counts = _value_counts(values)
+        self.n += int(counts["count"].sum())
+        self._merge(counts.with_columns(pl.lit(0, pl.Int64).alias("error")), 0)
+        return self
+
+    def merge(self, other):
+        """Add the counts of another sketch, as if its values had been counted here."""
+        self.n += other.n
+        self._merge(other.counters, other.floor)
+        return self
+
+    def _merge(self, counters, floor):
+        # A value missing on one side occurred at most `floor` times there.
+        merged = (
+            self.counters.join(counters, on="value", how="full", coalesce=True)
+            .select(
+                "value",
+                (pl.col("count").fill_null(self.floor) + pl.col("count_right").fill_null(floor)).alias("count"),
+                (pl.col("error").fill_null(self.floor) + pl.col("error_right").fill_null(floor)).alias("error"),
+            )
+            .sort("count", descending=True)
+        )
+        dropped = merged["count"][self.capacity:]
+        self.floor = max(self.floor + floor, dropped.max() if len(dropped) else 0)
+        self.counters = merged.head(self.capacity)
+
+    @property
+    def error_bound(self):
+        """The largest possible overestimate of any count."""
+        return max(self.floor, self.counters["error"].max() or 0)
+
+    def top(self, k=10):
+        """The `k` values with the largest counts, with `count`, `error` and `guaranteed`."""
+        counters = self.counters.sort("count", "value", descending=[True, False])
+        return counters.head(k).with_columns(
+            _guaranteed(counters["count"], counters["error"][:k], k, self.floor)
+        )
+
+
+class CountMin:
+    """A count-min sketch, plus the `capacity` values with the largest estimates."""
+
+    def __init__(self, width=2**16, depth=4, capacity=1000, seed=0):
+        # Imported here, so the chapters that only use top_values/top_rows don't load numpy.
+        import numpy as np
+
+        self.width = width
+        self.depth = depth
+        self.capacity = capacity
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.candidates = pl.Series("value", [], dtype=pl.String)
+        self.n = 0
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    @property
+    def error_bound(self):
+        """Every count is overestimated by at most this much, with probability `1 - delta`."""
+        return math.ceil(self.epsilon * self.n)
+
+    def _cells(self, values):
+        # Series.hash is stable within a Polars version, so sketches are only mergeable within one.
+        return [(values.hash(seed=self.seed + row) % self.width).to_numpy() for row in range(self.depth)]
+
+    def estimate(self, values):
+        """The estimated count of every value in `values` (a Series)."""
+        import numpy as np
+
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64)
+        cells = self._cells(values)
+        return np.min([self.table[row, cells[row]] for row in range(self.depth)], axis=0)
+
+    def update(self, values):
+        """Count the non-null `values` (a Series) of one batch."""
+        import numpy as np
+
+        counts = _value_counts(values)
+        self.n += int(counts["count"].sum())
+        weights = counts["count"].to_numpy()
+        for row, cells in enumerate(self._cells(counts["value"])):
+            np.add.at(self.table[row], cells, weights)
+        self._keep_candidates(counts["value"])
+        return self
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same width, depth and seed."""
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("only sketches with the same width, depth and seed can be merged")
+        self.n += other.n
+        self.table += other.table
+        self._keep_candidates(other.candidates)
+        return self
+
+    def _keep_candidates(self, values):
+        values = pl.concat([self.candidates, values]).unique()
+        estimates = pl.Series("count", self.estimate(values))
+        self.candidates = (
+            pl.DataFrame([values, estimates]).sort("count", descending=True).head(self.capacity)["value"]
+        )
+
+    def top(self, k=10):
+        """The `k` candidates with the largest estimates, with `count`, `error` and `guaranteed`."""
+        counts = pl.DataFrame([self.candidates, pl.Series("count", self.estimate(self.candidates))]).sort(
+            "count", "value", descending=[True, False]
+        )
+        error = self.error_bound
+        # A value that isn't a candidate may still have up to the smallest candidate's count.
+        bound = counts["count"][-1] if counts.height >= self.capacity else 0
+        return counts.head(k).with_columns(
+            pl.lit(error, pl.Int64).alias("error"),
+            _guaranteed(counts["count"], error, k, bound + error),
+        )
+
+
+SKETCHES = {"space_saving": SpaceSaving, "count_min": CountMin}
+
+
+def iter_column_batches(source, column, batch_size=1_000_000):
+    """The values of `column` in Series of at most `batch_size` values.
+
+    `source` is a DataFrame, a LazyFrame or the path of a CSV file. Lazy
+    sources are read in bounded memory with Polars versions that have
+    `LazyFrame.collect_batches`, and collected first with older ones.
+    """
+    if isinstance(source, (str, Path)):
+        source = pl.scan_csv(source, infer_schema=False)
+    if isinstance(source, pl.LazyFrame):
+        source = source.select(column)
+        if hasattr(source, "collect_batches"):
+            for batch in source.collect_batches(chunk_size=batch_size):
+                yield batch.to_series()
+            return
+        source = source.collect(engine="streaming")
+    for batch in source.select(column).iter_slices(batch_size):
+        yield batch.to_series()
+
+
+def approx_top_values(source, column, k=10, method="space_saving", batch_size=1_000_000, **sketch_options):
+    """The approximate `k` most common values of `column` in `source` (see `iter_column_batches`).
+
+    `method` is "space_saving" or "count_min", `sketch_options` go to its
+    class. Returns `column`, `count`, `error` (the largest possible
+    overestimate of the count) and `guaranteed` (certainly in the true top k).
+    """
+    sketch = SKETCHES[method](**sketch_options)
+    for values in iter_column_batches(source, column, batch_size):
+        sketch.update(values)
+    return sketch.top(k).rename({"value": column})
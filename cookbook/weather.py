@@ -0,0 +1,242 @@
+"""Downloading and cleaning the Canadian weather data from Chapter 5.
+
+The Polars functions from Chapter 5 live here so that other chapters (and
+the nightly rebuild) can import them instead of copying the code around.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import polars as pl
+
+# Station 5415 is Montréal/Pierre Elliott Trudeau, timeframe 1 is hourly data.
+STATION_ID = 5415
+TIMEFRAME = 1
+URL_TEMPLATE = (
+    "http://climate.weather.gc.ca/climate_data/bulk_data_e.html?format=csv"
+    "&stationID={station_id}&Year={year}&Month={month}&timeframe={timeframe}"
+    "&submit=Download+Data"
+)
+
+COLUMN_RENAMES = {
+    "Date/Time (LST)": "Date_time",
+    'Longitude (x)"': "Longitude",
+    "Longitude (x)": "Longitude",
+    "Latitude (y)": "Latitude",
+    "Station Name": "Station_Name",
+    "Climate ID": "Climate_ID",
+    "Temp (°C)": "Temperature_C",
+    "Dew Point Temp (°C)": "Dew_Point_Temp_C",
+    "Rel Hum (%)": "Relative_Humidity",
+    "Wind Spd (km/h)": "Wind_Speed_kmh",
+    "Visibility (km)": "Visibility_km",
+    "Stn Press (kPa)": "Station_Pressure_kPa",
+    "Weather": "Weather",
+}
+
+# Read as latin1 the UTF-8 byte order mark turns into 'ï»¿' and '°' into 'Â°'.
+HEADER_JUNK = ['ï»¿"', "\ufeff", "Â"]
+
+CLEAN_COLUMNS = [
+    "date_time",
+    "longitude",
+    "latitude",
+    "station_name",
+    "climate_id",
+    "temperature_c",
+    "dew_point_temp_c",
+    "relative_humidity",
+    "wind_speed_kmh",
+    "visibility_km",
+    "station_pressure_kpa",
+    "weather",
+]
+
+# The types of the cleaned columns, for writers that need one schema for every month.
+# Climate IDs are not always numbers (e.g. "702S006"), so they are kept as strings.
+CLEAN_SCHEMA = {
+    "date_time": pl.Datetime("us"),
+    "longitude": pl.Float64,
+    "latitude": pl.Float64,
+    "station_name": pl.String,
+    "climate_id": pl.String,
+    "temperature_c": pl.Float64,
+    "dew_point_temp_c": pl.Float64,
+    "relative_humidity": pl.Int64,
+    "wind_speed_kmh": pl.Int64,
+    "visibility_km": pl.Float64,
+    "station_pressure_kpa": pl.Float64,
+    "weather": pl.String,
+}
+
+
+def clean_data(data):
+    data = data.dropna(axis=1, how="any")
+    data = data.drop(["Year", "Month", "Day", "Time (LST)"], axis=1)
+    data.columns = data.columns.str.replace('ï»¿"', "")
+    data.columns = data.columns.str.replace("Â", "")
+    data = data.rename(
+        columns={
+            "Longitude (x)": "Longitude",
+            "Latitude (y)": "Latitude",
+            "Station Name": "Station_Name",
+            "Climate ID": "Climate_ID",
+            "Temp (°C)": "Temperature_C",
+            "Dew Point Temp (°C)": "Dew_Point_Temp_C",
+            "Rel Hum (%)": "Relative_Humidity",
+            "Wind Spd (km/h)": "Wind_Speed_kmh",
+            "Visibility (km)": "Visibility_km",
+            "Stn Press (kPa)": "Station_Pressure_kPa",
+            "Weather": "Weather",
+        }
+    )
+    data.columns = data.columns.str.lower()
+    data.index.name = "date_time"
+    return data
+
+
+def clean_column_name(name):
+    for junk in HEADER_JUNK:
+        name = name.replace(junk, "")
+    return COLUMN_RENAMES.get(name, name).lower()
+
+
+def clean_data_pl(data):
+    """Polars version of `clean_data`, done in a single pass over the data.
+
+    `data` can be a DataFrame or a LazyFrame (e.g. `pl.scan_csv` of a
+    multi-year file). The header is cleaned once on the schema, so only the
+    columns we keep are parsed. Empty strings become nulls in the same
+    projection, and columns with any null are dropped afterwards using the
+    null counts Polars keeps next to the data, so that does not need another
+    scan either.
+    """
+    lf = data.lazy()
+    clean_names = {name: clean_column_name(name) for name in lf.collect_schema().names()}
+    keep = {clean: name for name, clean in clean_names.items() if clean in CLEAN_COLUMNS}
+    data = lf.select(
+        [pl.col(keep[clean]).alias(clean) for clean in CLEAN_COLUMNS if clean in keep]
+    ).with_columns(
+        pl.when(pl.col(pl.String).str.len_chars() > 0).then(pl.col(pl.String)).name.keep()
+    ).collect()
+    null_counts = data.null_count().row(0, named=True)
+    return data.select([name for name, nulls in null_counts.items() if nulls == 0])
+
+
+def weather_url(year, month, station_id=STATION_ID, timeframe=TIMEFRAME, url_template=URL_TEMPLATE):
+    # Extra keywords are ignored by str.format, so templates with a hard-coded
+    # stationID (like the one in Chapter 5) keep working.
+    return url_template.format(station_id=station_id, year=year, month=month, timeframe=timeframe)
+
+
+def make_session(pool_size=8, retries=3, backoff=0.5):
+    """Create a `requests` session with a keep-alive pool and retry/backoff.
+
+    Retries cover connection errors and the usual transient status codes;
+    the wait between attempts grows as `backoff * 2 ** attempt`.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_weather_csv(source):
+    weather_data = pl.read_csv(
+        source,
+        try_parse_dates=True,
+        encoding="latin1",
+        has_header=True)
+    return clean_data_pl(weather_data)
+
+
+def scan_weather_csv(path):
+    """Clean a raw (possibly multi-year) weather CSV on disk without reading it twice."""
+    return clean_data_pl(pl.scan_csv(path, try_parse_dates=True, encoding="utf8-lossy"))
+
+
+def download_weather_month_pl(year, month, station_id=STATION_ID, timeframe=TIMEFRAME,
+                              url_template=URL_TEMPLATE, session=None, timeout=60, cache=None):
+    """Download and clean one month. Pass a `weather_cache.WeatherCache` as
+    `cache` to only touch the network for months that are not cached yet."""
+    if cache is not None:
+        from weather_cache import WeatherKey
+
+        return cache.get(
+            WeatherKey(station_id, year, month, timeframe),
+            lambda: download_weather_month_pl(
+                year, month, station_id, timeframe, url_template, session=session, timeout=timeout
+            ),
+        )
+    if session is None:
+        with make_session(pool_size=1) as session:
+            return download_weather_month_pl(
+                year, month, station_id, timeframe, url_template, session=session, timeout=timeout
+            )
+    url = weather_url(year, month, station_id, timeframe, url_template)
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return parse_weather_csv(BytesIO(response.content))
+
+
+def iter_weather_months(periods, station_id=STATION_ID, timeframe=TIMEFRAME,
+                        url_template=URL_TEMPLATE, max_workers=6, retries=3,
+                        backoff=0.5, session=None, timeout=60, cache=None):
+    """Download and clean `(year, month)` periods concurrently and yield them in order.
+
+    At most `max_workers` months are downloaded ahead of the one being
+    consumed, so memory stays flat however many periods there are.
+    """
+    if session is None:
+        with make_session(pool_size=max_workers, retries=retries, backoff=backoff) as session:
+            yield from iter_weather_months(
+                periods, station_id, timeframe, url_template, max_workers, retries, backoff,
+                session=session, timeout=timeout, cache=cache,
+            )
+        return
+
+    def fetch(period):
+        year, month = period
+        return download_weather_month_pl(
+            year, month, station_id, timeframe, url_template,
+            session=session, timeout=timeout, cache=cache,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for period in periods:
+            pending.append(pool.submit(fetch, period))
+            if len(pending) > max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def fetch_weather_months(periods, station_id=STATION_ID, timeframe=TIMEFRAME,
+                         url_template=URL_TEMPLATE, max_workers=6, retries=3,
+                         backoff=0.5, session=None, timeout=60, cache=None):
+    """Download and clean several months concurrently.
+
+    `periods` is an iterable of `(year, month)` tuples. Every worker downloads
+    a month and parses it straight away, so parsing overlaps with the other
+    downloads (Polars releases the GIL while it reads the CSV). All workers
+    share one keep-alive connection pool. The months are concatenated in the
+    order they were requested, so the result is the same as the list
+    comprehension in Chapter 5. Months found in `cache` are not downloaded.
+    To write many months to disk without holding them all, see weather_build.py.
+    """
+    data_by_month = list(iter_weather_months(
+        periods, station_id, timeframe, url_template, max_workers, retries, backoff, session, timeout, cache
+    ))
+    return pl.concat(data_by_month, how="vertical_relaxed")
@@ -0,0 +1,184 @@
+"""Monthly/daily weather aggregates that are updated as new hours arrive.
+
+Chapter 6 recomputes the monthly temperature median and snowiness over the
+whole year every time. `WeatherAggregates` instead keeps a small, mergeable
+state per bucket (month, day or hour of the day):
+
+* counts and sums, for the mean temperature and the fraction of snowy hours
+* a histogram of the temperatures at `resolution` degrees, for the median
+
+New rows are aggregated on their own and merged into the buckets they touch;
+only those buckets' results are recomputed. The weather data is recorded to
+0.1 °C, so with the default resolution the histogram (and thus the median) is
+exact. With a coarser resolution the median is off by at most half of it.
+
+`exact_aggregates` computes the same table from the raw rows, to check the
+incremental results.
+"""
+from pathlib import Path
+
+import polars as pl
+
+from weather_conditions import condition_flag
+
+GRANULARITIES = ("month", "day", "hour_of_day")
+
+_STATS = ["hours", "temperature_count", "temperature_sum", "weather_count", "snow_count"]
+
+
+def _bucket(granularity):
+    if granularity == "month":
+        return pl.col("date_time").dt.truncate("1mo").alias("bucket")
+    if granularity == "day":
+        return pl.col("date_time").dt.truncate("1d").alias("bucket")
+    if granularity == "hour_of_day":
+        return pl.col("date_time").dt.hour().alias("bucket")
+    raise ValueError(f"unknown granularity {granularity!r}, use one of {GRANULARITIES}")
+
+
+def _snowing(rows):
+    # An Enum weather column (see weather_conditions.py) is checked once per category.
+    dtype = rows.collect_schema()["weather"]
+    if isinstance(dtype, pl.Enum):
+        return condition_flag(dtype, "Snow")
+    return pl.col("weather").str.contains("Snow")
+
+
+def _partial(rows, granularity, resolution):
+    """Per-bucket state for `rows` alone."""
+    rows = rows.lazy().select(
+        _bucket(granularity),
+        pl.col("temperature_c"),
+        _snowing(rows).alias("snowing"),
+    )
+    stats = rows.group_by("bucket").agg(
+        pl.len().alias("hours"),
+        pl.col("temperature_c").count().alias("temperature_count"),
+        pl.col("temperature_c").sum().alias("temperature_sum"),
+        pl.col("snowing").count().alias("weather_count"),
+        pl.col("snowing").sum().cast(pl.UInt32).alias("snow_count"),
+    )
+    histogram = (
+        rows.select("bucket", (pl.col("temperature_c") / resolution).round().cast(pl.Int32).alias("bin"))
+        .drop_nulls("bin")
+        .group_by("bucket", "bin")
+        .agg(pl.len().alias("count"))
+    )
+    return pl.collect_all([stats, histogram])
+
+
+def _merge(state, partial, keys, columns):
+    return pl.concat([state, partial]).group_by(keys).agg(pl.col(columns).sum())
+
+
+def histogram_medians(histogram, resolution, keys=("bucket",), alias="temperature_median"):
+    """The median of every group of `keys` in a (keys..., bin, count) histogram,
+    the way Polars computes it (the mean of the two middle values when the count is even)."""
+    keys = list(keys)
+    return (
+        histogram.sort([*keys, "bin"])
+        .with_columns(
+            pl.col("count").cum_sum().over(keys).alias("cumulative"),
+            pl.col("count").sum().over(keys).alias("total"),
+        )
+        .group_by(keys)
+        .agg(
+            pl.col("bin").filter(pl.col("cumulative") >= (pl.col("total") + 1) // 2).first().alias("lower"),
+            pl.col("bin").filter(pl.col("cumulative") >= pl.col("total") // 2 + 1).first().alias("upper"),
+        )
+        .select(*keys, ((pl.col("lower") + pl.col("upper")) / 2 * resolution).alias(alias))
+    )
+
+
+def _results(stats, histogram, resolution):
+    return (
+        stats.join(histogram_medians(histogram, resolution), on="bucket", how="left")
+        .select(
+            "bucket",
+            "hours",
+            "temperature_median",
+            (pl.col("temperature_sum") / pl.col("temperature_count")).alias("temperature_mean"),
+            (pl.col("snow_count") / pl.col("weather_count")).alias("snowiness"),
+        )
+        .sort("bucket")
+    )
+
+
+class WeatherAggregates:
+    def __init__(self, granularities=GRANULARITIES, resolution=0.1):
+        self.granularities = tuple(granularities)
+        self.resolution = resolution
+        self._stats = {}
+        self._histograms = {}
+        self._results = {}
+
+    def update(self, rows):
+        """Merge new hourly rows (with date_time, temperature_c and weather)
+        into the state. Returns the number of buckets that changed per granularity."""
+        touched = {}
+        for granularity in self.granularities:
+            stats, histogram = _partial(rows, granularity, self.resolution)
+            touched[granularity] = stats.height
+            if granularity not in self._stats:
+                self._stats[granularity] = stats
+                self._histograms[granularity] = histogram
+                self._results[granularity] = _results(stats, histogram, self.resolution)
+                continue
+
+            keys = stats.select("bucket")
+            old_stats = self._stats[granularity]
+            old_histogram = self._histograms[granularity]
+            new_stats = _merge(old_stats.join(keys, on="bucket", how="semi"), stats, ["bucket"], _STATS)
+            new_histogram = _merge(
+                old_histogram.join(keys, on="bucket", how="semi"), histogram, ["bucket", "bin"], ["count"]
+            )
+            self._stats[granularity] = pl.concat([old_stats.join(keys, on="bucket", how="anti"), new_stats])
+            self._histograms[granularity] = pl.concat(
+                [old_histogram.join(keys, on="bucket", how="anti"), new_histogram]
+            )
+            self._results[granularity] = pl.concat([
+                self._results[granularity].join(keys, on="bucket", how="anti"),
+                _results(new_stats, new_histogram, self.resolution),
+            ]).sort("bucket")
+        return touched
+
+    def result(self, granularity="month"):
+        """bucket, hours, temperature_median, temperature_mean and snowiness per bucket."""
+        return self._results[granularity]
+
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for granularity in self._stats:
+            self._stats[granularity].write_parquet(directory / f"{granularity}_stats.parquet")
+            self._histograms[granularity].write_parquet(directory / f"{granularity}_histogram.parquet")
+
+    @classmethod
+    def load(cls, directory, granularities=GRANULARITIES, resolution=0.1):
+        directory = Path(directory)
+        aggregates = cls(granularities, resolution)
+        for granularity in granularities:
+            stats_path = directory / f"{granularity}_stats.parquet"
+            if stats_path.exists():
+                aggregates._stats[granularity] = pl.read_parquet(stats_path)
+                aggregates._histograms[granularity] = pl.read_parquet(directory / f"{granularity}_histogram.parquet")
+                aggregates._results[granularity] = _results(
+                    aggregates._stats[granularity], aggregates._histograms[granularity], resolution
+                )
+        return aggregates
+
+
+def exact_aggregates(rows, granularity="month"):
+    """The same table as `WeatherAggregates.result`, computed from all the raw rows."""
+    return (
+        rows.lazy()
+        .group_by(_bucket(granularity))
+        .agg(
+            pl.len().alias("hours"),
+            pl.col("temperature_c").median().alias("temperature_median"),
+            pl.col("temperature_c").mean().alias("temperature_mean"),
+            _snowing(rows).mean().alias("snowiness"),
+        )
+        .sort("bucket")
+        .collect()
+    )
@@ -0,0 +1,128 @@
+"""Building a multi-year weather file one month at a time.
+
+Chapter 5 keeps every month in memory, concatenates them and then writes
+the year. `build_weather_file` appends each cleaned month to the output as
+soon as it has been downloaded instead, so memory holds a handful of months
+whether we assemble one station-year or decades of them:
+
+    build_weather_file([(2012, month) for month in range(1, 13)], "weather_2012.parquet")
+
+Parquet output gets one row group per month, with min/max statistics, so a
+reader filtering on `date_time` skips the months it doesn't need. CSV output
+is written in the layout of data/weather_2012.csv.
+
+Months can drop columns that have missing values (see `clean_data_pl`),
+but a file has a single schema: every month is written with all of
+`CLEAN_SCHEMA`'s columns, null where the month didn't have them.
+"""
+import os
+from pathlib import Path
+
+import polars as pl
+
+from weather import CLEAN_SCHEMA, STATION_ID, TIMEFRAME, URL_TEMPLATE, iter_weather_months
+
+FORMATS = ("parquet", "csv")
+CSV_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def conform(month, schema=CLEAN_SCHEMA):
+    """`month` with exactly the columns and types of `schema`."""
+    return month.select([
+        pl.col(name).cast(dtype) if name in month.columns else pl.lit(None, dtype=dtype).alias(name)
+        for name, dtype in schema.items()
+    ])
+
+
+class MonthlyWriter:
+    """Append months to one Parquet or CSV file; the file appears at `path` on close."""
+
+    def __init__(self, path, format=None, schema=CLEAN_SCHEMA, compression="zstd"):
+        self.path = Path(path)
+        self.format = format or self.path.suffix.lstrip(".")
+        if self.format not in FORMATS:
+            raise ValueError(f"unknown format {self.format!r}, use one of {FORMATS}")
+        self.schema = schema
+        self.compression = compression
+        self.rows = 0
+        self.row_groups = 0
+        self._tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        self._writer = None
+
+    def write(self, month):
+        month = conform(month, self.schema)
+        if month.height == 0:
+            return
+        if self.format == "parquet":
+            self._write_parquet(month)
+        else:
+            self._write_csv(month)
+        self.rows += month.height
+        self.row_groups += 1
+
+    def _write_parquet(self, month):
+        import pyarrow.parquet as pq
+
+        table = month.to_arrow()
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self._tmp_path, table.schema, compression=self.compression, write_statistics=True
+            )
+        # One row group per month.
+        self._writer.write_table(table, row_group_size=month.height)
+
+    def _write_csv(self, month):
+        if self._writer is None:
+            self._writer = open(self._tmp_path, "w", encoding="utf-8", newline="")
+            month.write_csv(self._writer, datetime_format=CSV_DATETIME_FORMAT)
+        else:
+            month.write_csv(self._writer, include_header=False, datetime_format=CSV_DATETIME_FORMAT)
+
+    def close(self):
+        if self._writer is None:
+            # Nothing was written: still produce an (empty) file with the schema.
+            empty = pl.DataFrame(schema=self.schema)
+            if self.format == "parquet":
+                empty.write_parquet(self._tmp_path)
+            else:
+                empty.write_csv(self._tmp_path)
+        else:
+            self._writer.close()
+            self._writer = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_months(months, path, format=None, schema=CLEAN_SCHEMA):
+    """Write an iterable of cleaned monthly frames to `path`, one at a time. Returns the number of rows."""
+    with MonthlyWriter(path, format, schema) as writer:
+        for month in months:
+            writer.write(month)
+    return writer.rows
+
+
+def build_weather_file(periods, path, format=None, station_id=STATION_ID, timeframe=TIMEFRAME,
+                       url_template=URL_TEMPLATE, max_workers=6, cache=None):
+    """Download `(year, month)` periods and stream them into one Parquet or CSV file.
+
+    The months are written in the order of `periods`; pass them sorted to get
+    a file sorted by `date_time`.
+    """
+    months = iter_weather_months(
+        periods, station_id, timeframe, url_template, max_workers=max_workers, cache=cache
+    )
+    return write_months(months, path, format)
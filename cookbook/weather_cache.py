@@ -0,0 +1,132 @@
+"""On-disk cache of downloaded and cleaned weather months.
+
+Every month is stored as a Parquet file keyed by (stationID, year, month,
+timeframe). Months that are over never change, so once they are cached they
+are never downloaded again. The current (or a future) month is downloaded
+again once its copy is older than `revalidate_after` seconds. When the cache
+grows past `max_bytes` the least recently used months are evicted.
+"""
+import datetime
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import polars as pl
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "cache" / "weather"
+
+WeatherKey = namedtuple("WeatherKey", ["station_id", "year", "month", "timeframe"])
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.revalidations} revalidations, {self.evictions} evictions"
+        )
+
+
+class WeatherCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=512 * 2**20, revalidate_after=6 * 3600):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / "index.json"
+        if self._index_path.exists():
+            self._index = json.loads(self._index_path.read_text())
+        else:
+            self._index = {}
+
+    @staticmethod
+    def is_closed(key, today=None):
+        """A month is closed (and immutable) once it lies entirely in the past."""
+        today = today or datetime.date.today()
+        return (key.year, key.month) < (today.year, today.month)
+
+    def get(self, key, fetch, flavor="polars"):
+        """Return the cached month for `key`, calling `fetch()` on a miss.
+
+        `fetch` must return a Polars DataFrame. `flavor` keeps differently
+        cleaned versions of the same month (e.g. pandas and Polars) apart.
+        """
+        name = self._file_name(key, flavor)
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is not None and (self.root / name).exists():
+                if self.is_closed(key) or time.time() - entry["fetched_at"] < self.revalidate_after:
+                    self.stats.hits += 1
+                    entry["last_access"] = time.time()
+                    self._save_index()
+                    return pl.read_parquet(self.root / name)
+                self.stats.revalidations += 1
+            else:
+                self.stats.misses += 1
+
+        data = fetch()
+        self._put(name, data)
+        return data
+
+    def get_pandas(self, key, fetch):
+        """Like `get` for the pandas `download_weather_month`, which indexes on date_time."""
+        data = self.get(key, lambda: pl.from_pandas(fetch().reset_index()), flavor="pandas")
+        return data.to_pandas().set_index("date_time")
+
+    def size(self):
+        return sum(entry["size"] for entry in self._index.values())
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._index):
+                self._remove(name)
+            self._save_index()
+
+    def _file_name(self, key, flavor):
+        return (
+            f"{flavor}-station{key.station_id}-{key.year:04d}-{key.month:02d}"
+            f"-timeframe{key.timeframe}.parquet"
+        )
+
+    def _put(self, name, data):
+        path = self.root / name
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        data.write_parquet(tmp_path, statistics=True)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._index[name] = {"size": path.stat().st_size, "fetched_at": now, "last_access": now}
+            self._evict(keep=name)
+            self._save_index()
+
+    def _evict(self, keep):
+        by_age = sorted(self._index, key=lambda name: self._index[name]["last_access"])
+        for name in by_age:
+            if self.size() <= self.max_bytes:
+                break
+            if name != keep:
+                self._remove(name)
+                self.stats.evictions += 1
+
+    def _remove(self, name):
+        (self.root / name).unlink(missing_ok=True)
+        del self._index[name]
+
+    def _save_index(self):
+        tmp_path = self._index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._index, indent=1))
+        os.replace(tmp_path, self._index_path)
+
+    def __repr__(self):
+        return f"WeatherCache({str(self.root)!r}, {len(self._index)} months, {asdict(self.stats)})"
@@ -0,0 +1,79 @@
+"""Weather conditions as an Enum with a flag table per condition.
+
+The `weather` column has a few dozen distinct values ("Fog", "Snow,Blowing
+Snow", "Rain Showers", ...) repeated over every hour. `str.contains("Snow")`
+searches every one of those strings again. Once the column is an Enum of its
+distinct values, a predicate only has to be evaluated on the categories: the
+result is a small boolean table that is gathered by each row's category code.
+
+    weather = encode_weather(pl_weather_2012)
+    weather.with_columns(condition_flags(weather.schema["weather"]))
+
+Two kinds of predicates are supported:
+
+* "substring": the condition appears anywhere, like `str.contains` ("Snow"
+  matches "Snow Showers" and "Moderate Snow,Blowing Snow")
+* "token": one of the comma separated conditions is exactly the token
+  ("Snow" matches "Snow,Blowing Snow" but not "Snow Showers")
+"""
+import polars as pl
+
+CONDITIONS = ["Snow", "Rain", "Fog", "Drizzle", "Freezing", "Thunderstorms", "Showers", "Haze", "Clear", "Cloudy"]
+MATCHES = ("substring", "token")
+
+
+def flag_name(condition):
+    # "Thunderstorms" -> "is_thunderstorms", "Blowing Snow" -> "is_blowing_snow"
+    return "is_" + condition.lower().replace(" ", "_")
+
+
+def weather_enum(values):
+    """An Enum of the distinct, non-null `values`, sorted."""
+    return pl.Enum(sorted({value for value in values if value is not None}))
+
+
+def encode_weather(frame, column="weather"):
+    """`frame` (eager or lazy) with `column` cast to an Enum of its distinct values.
+
+    On a LazyFrame this runs one query to find the distinct values.
+    """
+    if isinstance(frame.collect_schema()[column], pl.Enum):
+        return frame
+    values = frame.lazy().select(pl.col(column).unique()).collect().to_series()
+    return frame.with_columns(pl.col(column).cast(weather_enum(values)))
+
+
+def _predicate(condition, column, match):
+    if match == "substring":
+        return pl.col(column).str.contains(condition, literal=True)
+    if match == "token":
+        return pl.col(column).str.split(",").list.eval(pl.element().str.strip_chars() == condition).list.any()
+    raise ValueError(f"unknown match {match!r}, use one of {MATCHES}")
+
+
+def flag_table(dtype, conditions=CONDITIONS, column="weather", match="substring"):
+    """One row per category of the Enum `dtype`, with a boolean column per condition."""
+    return pl.DataFrame({column: dtype.categories}).with_columns([
+        _predicate(condition, column, match).alias(flag_name(condition)) for condition in conditions
+    ])
+
+
+def condition_flags(dtype, conditions=CONDITIONS, column="weather", match="substring"):
+    """Expressions flagging every condition for an Enum `column` of type `dtype`.
+
+    The predicates run once per category; rows just look up their code.
+    Null weather gives a null flag, as with `str.contains`.
+    """
+    table = flag_table(dtype, conditions, column, match)
+    codes = pl.col(column).to_physical()
+    return [pl.lit(table[flag_name(condition)]).gather(codes).alias(flag_name(condition)) for condition in conditions]
+
+
+def condition_flag(dtype, condition, column="weather", match="substring"):
+    return condition_flags(dtype, [condition], column, match)[0]
+
+
+def with_condition_flags(frame, conditions=CONDITIONS, column="weather", match="substring"):
+    """Encode `column` if needed and add an `is_<condition>` column per condition."""
+    frame = encode_weather(frame, column)
+    return frame.with_columns(condition_flags(frame.collect_schema()[column], conditions, column, match))
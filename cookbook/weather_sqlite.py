@@ -0,0 +1,142 @@
+"""Keeping the hourly weather in a local SQLite database.
+
+data/weather_2012.sqlite has a `weather_2012(id, date_time, temp)` table.
+It is part of the repository, so it is only ever opened read-only. Writes
+go to a copy in data/cache/sqlite (WRITE_PATH), made on the first write.
+Writes go through `executemany` in large transactions with WAL journaling,
+and reads come back in batches from `pl.read_database`, so neither side
+needs the whole history in memory. The `date_time` index (created by the
+writer) turns range queries into index lookups instead of full scans.
+Timestamps are stored as `YYYY-MM-DD HH:MM:SS` text, which sorts in
+chronological order.
+"""
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import polars as pl
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SQLITE_PATH = DATA_DIR / "weather_2012.sqlite"
+WRITE_PATH = DATA_DIR / "cache" / "sqlite" / "weather_2012.sqlite"
+TABLE = "weather_2012"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Only for the connection: nothing here is stored in the database file.
+PRAGMAS = {
+    "temp_store": "MEMORY",
+    "cache_size": -64_000,  # 64 MB
+}
+
+# Stored in the database file (journal_mode), so only set when writing.
+WRITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # safe with WAL, and no fsync on every commit
+}
+
+
+def connect(path=SQLITE_PATH, table=TABLE, readonly=True):
+    """A connection to the database at `path`.
+
+    Read-only connections open the file with a `mode=ro` URI and don't
+    change it. Writable ones switch it to WAL and create the table and
+    the `date_time` index if they are missing.
+    """
+    if readonly:
+        connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    else:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path)
+    for pragma, value in (PRAGMAS if readonly else {**PRAGMAS, **WRITE_PRAGMAS}).items():
+        connection.execute(f"PRAGMA {pragma} = {value}")
+    if readonly:
+        return connection
+    with connection:
+        connection.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date_time TIMESTAMP,
+                temp DOUBLE PRECISION
+            )"""
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {table}_date_time ON {table} (date_time)")
+    return connection
+
+
+def write_weather(frame, path=WRITE_PATH, table=TABLE, batch_size=100_000, replace=False, source=SQLITE_PATH):
+    """Insert the `date_time` and `temperature_c` columns of a cleaned weather frame.
+
+    Every batch is one transaction. With `replace=True` the rows in the
+    frame's time range are deleted first, so a month can be re-ingested.
+    A database that doesn't exist yet starts as a copy of `source` (None
+    for an empty one).
+    """
+    rows = frame.select(
+        pl.col("date_time").dt.strftime(TIMESTAMP_FORMAT),
+        pl.col("temperature_c").alias("temp"),
+    )
+    path = Path(path)
+    if not path.exists() and source is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, path)
+    connection = connect(path, table, readonly=False)
+    try:
+        if replace and rows.height:
+            with connection:
+                connection.execute(
+                    f"DELETE FROM {table} WHERE date_time BETWEEN ? AND ?",
+                    (rows["date_time"].min(), rows["date_time"].max()),
+                )
+        for batch in rows.iter_slices(batch_size):
+            with connection:
+                connection.executemany(f"INSERT INTO {table} (date_time, temp) VALUES (?, ?)", batch.rows())
+    finally:
+        connection.close()
+    return rows.height
+
+
+def _timestamp(value):
+    # Parsed and formatted, so strings compare like the stored timestamps.
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def range_query(start=None, end=None, table=TABLE):
+    """SQL and its parameters for the rows with `start <= date_time < end`."""
+    conditions, parameters = [], []
+    if start is not None:
+        conditions.append("date_time >= ?")
+        parameters.append(_timestamp(start))
+    if end is not None:
+        conditions.append("date_time < ?")
+        parameters.append(_timestamp(end))
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT date_time, temp FROM {table}{where} ORDER BY date_time", parameters
+
+
+def iter_weather(start=None, end=None, path=SQLITE_PATH, table=TABLE, batch_size=50_000):
+    """Yield DataFrames of at most `batch_size` rows between `start` and `end`."""
+    query, parameters = range_query(start, end, table)
+    connection = connect(path, table)
+    try:
+        batches = pl.read_database(
+            query,
+            connection,
+            execute_options={"parameters": parameters},
+            iter_batches=True,
+            batch_size=batch_size,
+            schema_overrides={"date_time": pl.String, "temp": pl.Float64},
+        )
+        for batch in batches:
+            yield batch.with_columns(pl.col("date_time").str.to_datetime(TIMESTAMP_FORMAT))
+    finally:
+        connection.close()
+
+
+def read_weather(start=None, end=None, path=SQLITE_PATH, table=TABLE, batch_size=50_000):
+    batches = list(iter_weather(start, end, path, table, batch_size))
+    if not batches:
+        return pl.DataFrame(schema={"date_time": pl.Datetime("us"), "temp": pl.Float64})
+    return pl.concat(batches)
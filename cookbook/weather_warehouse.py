@@ -0,0 +1,132 @@
+"""A Hive-partitioned Parquet store for the cleaned weather data.
+
+Every station-month is written to its own file:
+
+    data/weather_warehouse/station=5415/year=2012/month=12/data.parquet
+
+`scan_weather` reads the store with `pl.scan_parquet`. A filter on the
+partition columns (`station`, `year`, `month`) means Polars only opens the
+matching files, and filters on other columns (like `date_time`) can skip row
+groups using the min/max statistics stored in every file. So "median
+temperature for December 2012" reads a single file.
+
+`ingest_dataset` fills the warehouse from a cached dataset such as
+weather_2012 (see datasets.py), and again only when its source changes.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import polars as pl
+
+import datasets
+from weather import STATION_ID, TIMEFRAME, URL_TEMPLATE, download_weather_month_pl, make_session
+
+DEFAULT_WAREHOUSE_DIR = Path(__file__).resolve().parent.parent / "data" / "weather_warehouse"
+
+# A month of hourly data is ~750 rows, so a week per row group keeps the
+# date_time statistics useful without making the files fragmented.
+ROW_GROUP_SIZE = 24 * 7
+
+# Bump when the layout changes, so datasets are ingested again.
+WAREHOUSE_VERSION = 1
+
+
+def partition_path(root, station_id, year, month):
+    return Path(root) / f"station={station_id}" / f"year={year}" / f"month={month}" / "data.parquet"
+
+
+def write_month(data, year, month, root=DEFAULT_WAREHOUSE_DIR, station_id=STATION_ID):
+    """Write (or replace) one cleaned station-month."""
+    path = partition_path(root, station_id, year, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data.sort("date_time").write_parquet(path, statistics=True, row_group_size=ROW_GROUP_SIZE)
+    return path
+
+
+def ingest_frame(data, root=DEFAULT_WAREHOUSE_DIR, station_id=STATION_ID):
+    """Split a cleaned frame (e.g. a whole year from Chapter 5) into station-months."""
+    paths = []
+    parts = data.with_columns(
+        pl.col("date_time").dt.year().alias("_year"),
+        pl.col("date_time").dt.month().alias("_month"),
+    ).partition_by("_year", "_month", as_dict=True)
+    for (year, month), part in parts.items():
+        paths.append(write_month(part.drop("_year", "_month"), year, month, root, station_id))
+    return paths
+
+
+def _saved_sources(root):
+    try:
+        meta = json.loads((Path(root) / "sources.json").read_text())
+    except FileNotFoundError:
+        return {}
+    return meta["sources"] if meta.get("version") == WAREHOUSE_VERSION else {}
+
+
+def ingest_dataset(name="weather_2012", root=DEFAULT_WAREHOUSE_DIR, station_id=STATION_ID, refresh=False):
+    """Ingest the cleaned dataset `name`, unless it is already in the warehouse with the same fingerprint.
+
+    The fingerprint of the source and the months written are saved in
+    sources.json; months the previous version wrote and this one doesn't
+    are removed. Returns the paths of the dataset's months.
+    """
+    root = Path(root)
+    sources = _saved_sources(root)
+    fingerprint = datasets.fingerprint(name)
+    saved = sources.get(name, {})
+    if not refresh and saved.get("fingerprint") == fingerprint:
+        return [root / path for path in saved["paths"]]
+    paths = ingest_frame(datasets.load(name), root, station_id)
+    written = sorted(path.relative_to(root).as_posix() for path in paths)
+    for stale in set(saved.get("paths", ())) - set(written):
+        (root / stale).unlink(missing_ok=True)
+    sources[name] = {"fingerprint": fingerprint, "paths": written}
+    tmp_path = root / f"sources.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps({"version": WAREHOUSE_VERSION, "sources": sources}, indent=1))
+    os.replace(tmp_path, root / "sources.json")
+    return paths
+
+
+def ingest_csv(path, root=DEFAULT_WAREHOUSE_DIR, station_id=STATION_ID):
+    """Load a cleaned CSV such as data/weather_2012.csv into the warehouse."""
+    return ingest_frame(pl.read_csv(path, try_parse_dates=True), root, station_id)
+
+
+def ingest_months(periods, root=DEFAULT_WAREHOUSE_DIR, station_id=STATION_ID, timeframe=TIMEFRAME,
+                  url_template=URL_TEMPLATE, max_workers=6, cache=None, overwrite=False):
+    """Download `(year, month)` periods straight into the warehouse.
+
+    Months that are already in the warehouse are skipped unless `overwrite`
+    is set, so a nightly run only downloads new months.
+    """
+    periods = [
+        (year, month) for year, month in periods
+        if overwrite or not partition_path(root, station_id, year, month).exists()
+    ]
+    session = make_session(pool_size=max_workers)
+
+    def ingest(period):
+        year, month = period
+        data = download_weather_month_pl(
+            year, month, station_id, timeframe, url_template, session=session, cache=cache
+        )
+        return write_month(data, year, month, root, station_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(ingest, periods))
+
+
+def scan_weather(root=DEFAULT_WAREHOUSE_DIR):
+    """Lazily scan the warehouse. Adds the `station`, `year` and `month` partition columns.
+
+    The rows are sorted by station and date_time: the files come in path
+    order, where month=10 sorts before month=2. Filters are still applied
+    before the sort, so they prune files and row groups as before.
+    """
+    return pl.scan_parquet(
+        Path(root) / "**" / "*.parquet",
+        hive_partitioning=True,
+        hive_schema={"station": pl.Int64, "year": pl.Int32, "month": pl.Int8},
+    ).sort("station", "date_time")
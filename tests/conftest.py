@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# The cookbook helpers and the synthetic data generator are plain modules, not a package.
+sys.path[:0] = [str(ROOT / "cookbook"), str(ROOT / "benchmarks")]
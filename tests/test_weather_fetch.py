@@ -0,0 +1,83 @@
+"""fetch_weather_months against a local HTTP stand-in for climate.weather.gc.ca."""
+import io
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import polars as pl
+import pytest
+
+from synthetic import RAW_WEATHER_COLUMNS, weather_chunk
+from weather import download_weather_month_pl, fetch_weather_months
+
+PERIODS = [(2012, 1), (2012, 2), (2012, 3), (2012, 4)]
+FLAKY_MONTH = (2012, 2)
+
+
+def month_csv(year, month):
+    """A raw month in the bulk download layout (BOM'd, quoted header)."""
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    first_hour = int((start - datetime(2012, 1, 1)).total_seconds() // 3600)
+    hours = int((end - start).total_seconds() // 3600)
+    buffer = io.BytesIO()
+    buffer.write(("\ufeff" + ",".join(f'"{name}"' for name in RAW_WEATHER_COLUMNS) + "\n").encode("utf-8"))
+    weather_chunk(np.random.default_rng([year, month]), first_hour, hours).write_csv(
+        buffer, include_header=False, quote_style="always"
+    )
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def server():
+    requests_seen = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            period = (int(query["Year"][0]), int(query["Month"][0]))
+            with lock:
+                requests_seen.append(period)
+                first_try = requests_seen.count(period) == 1
+            if period == FLAKY_MONTH and first_try:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = month_csv(*period)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    url_template = f"http://127.0.0.1:{httpd.server_port}/bulk?Year={{year}}&Month={{month}}"
+    yield url_template, requests_seen
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_weather_months_matches_sequential_download(server):
+    url_template, requests_seen = server
+
+    fetched = fetch_weather_months(PERIODS, url_template=url_template, max_workers=3, backoff=0)
+
+    # The 503 was retried, and every other month was downloaded once.
+    assert requests_seen.count(FLAKY_MONTH) == 2
+    assert sorted(set(requests_seen)) == PERIODS
+    sequential = pl.concat(
+        [download_weather_month_pl(year, month, url_template=url_template) for year, month in PERIODS],
+        how="vertical_relaxed",
+    )
+    assert fetched.equals(sequential)
+    assert fetched["date_time"].is_sorted()
+    assert fetched.height == (31 + 29 + 31 + 30) * 24